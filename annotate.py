@@ -0,0 +1,49 @@
+import argparse
+import glob
+import os
+from config import *
+from gesture.batch import BatchAnnotator
+
+
+def expand_inputs(inputs):
+    # Dosya, klasör veya glob deseni kabul edilir
+    video_paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            video_paths.extend(sorted(os.path.join(item, name) for name in os.listdir(item)
+                                      if name.lower().endswith((".mp4", ".avi", ".mov", ".mkv"))))
+        else:
+            video_paths.extend(sorted(glob.glob(item)) or [item])
+    return video_paths
+
+def main():
+    parser = argparse.ArgumentParser(description="Video dosyalarına el landmark'ları ve hareket etiketleri ekle")
+    parser.add_argument("inputs", nargs="+", help="Video dosyaları, klasörler veya glob desenleri")
+    parser.add_argument("--output", default=ANNOTATE_OUTPUT_DIR)
+    parser.add_argument("--workers", type=int, default=ANNOTATE_WORKERS)
+    parser.add_argument("--chunk-frames", type=int, default=ANNOTATE_CHUNK_FRAMES)
+    parser.add_argument("--static-image-mode", action="store_true",
+                        help="Her kareyi bağımsız işle (daha yavaş, parça sınırlarından etkilenmez)")
+    args = parser.parse_args()
+
+    annotator = BatchAnnotator(args.output, args.workers, args.chunk_frames, args.static_image_mode)
+    try:
+        stats = annotator.run(expand_inputs(args.inputs))
+    except KeyboardInterrupt:
+        print("\nDurduruldu; aynı komutla kaldığı yerden devam edebilirsiniz.")
+        return
+
+    if stats["failed_videos"] or stats["failed_chunks"]:
+        print(f"\nHatalı: {len(stats['failed_videos'])} video, {len(stats['failed_chunks'])} parça "
+              f"(başarısız parçalar aynı komutla tekrar denenir)")
+    if not stats["frames"]:
+        return
+    wall_fps = stats["frames"] / stats["wall_seconds"]
+    core_fps = stats["frames"] / stats["busy_seconds"]
+    print(f"\n{stats['frames']} kare, {stats['chunks']} parça, {stats['wall_seconds']:.1f} sn")
+    print(f"Toplam: {wall_fps:.1f} kare/sn ({stats['workers']} süreç)")
+    print(f"Çekirdek başına: {core_fps:.1f} kare/sn (worker'ların meşgul olduğu süreye göre), "
+          f"{wall_fps / stats['workers']:.1f} kare/sn (duvar saatine göre)")
+
+if __name__ == "__main__":
+    main()
@@ -22,8 +22,89 @@ MENU_ITEM_SPACING = 50
 # Gesture Settings
 MIN_DETECTION_CONFIDENCE = 0.5
 MIN_TRACKING_CONFIDENCE = 0.5
-MAX_NUM_HANDS = 1
+MAX_NUM_HANDS = 2
+PINCH_THRESHOLD = 0.045
+CURSOR_SMOOTHING = 0.5  # Yumuşatma faktörü (0-1 arası)
+
+# Multi-hand tracking
+HAND_MATCH_MAX_DISTANCE = 0.15  # Ortalama landmark mesafesi (normalized)
+HAND_MATCH_MIN_IOU = 0.3
+HAND_LOST_FRAMES = 5  # Bu kadar kare görünmeyen elin kimliği silinir
+CURSOR_OWNER_POLICY = "sticky"  # "sticky", "largest" veya "first"
 
 # Scroll Settings
 MOVEMENT_THRESHOLD = 20
-SCROLL_SENSITIVITY = 0.8 
\ No newline at end of file
+SCROLL_SENSITIVITY = 0.8
+
+# Spotify Transport
+SPOTIFY_POOL_SIZE = 4
+SPOTIFY_REQUEST_TIMEOUT = (2.0, 3.0)  # (bağlantı, okuma) saniye; arka plan çağrıları
+SPOTIFY_FOREGROUND_TIMEOUT = (1.0, 1.0)  # Ana döngüden gelen çağrılar: tek deneme, kısa timeout
+SPOTIFY_MAX_RETRIES = 2  # Sadece arka plan çağrıları (playlist araması, device yenileme) tekrar dener
+SPOTIFY_BACKOFF_BASE = 0.2
+SPOTIFY_BACKOFF_MAX = 2.0
+SPOTIFY_MAX_RATE_LIMIT_WAIT = 1.0  # Arka plan çağrıları en fazla bu kadar bekler; ana döngü hiç beklemez
+DEVICE_REFRESH_INTERVAL = 30.0
+
+# Spotify OAuth
+TOKEN_CACHE_PATH = ".cache"
+TOKEN_REFRESH_MARGIN = 300  # Süre dolmadan bu kadar saniye önce yenile
+TOKEN_REFRESH_RETRY = 30
+
+# Playback Clock
+PLAYBACK_POLL_INTERVAL = 5.0  # Spotify durumunu bu aralıkla sor
+PLAYBACK_END_POLL_INTERVAL = 1.0  # Şarkı sonunda daha sık sor
+PLAYBACK_COMMAND_GRACE = 2.0  # Komuttan sonra bu süre içinde alınan durum örnekleri yok sayılır
+CLOCK_SNAP_THRESHOLD_MS = 2000  # Daha büyük farklarda saat doğrudan atlar
+CLOCK_SLEW_MS = 1000  # Küçük farklar bu süreye yayılarak düzeltilir
+
+# Output
+OUTPUT_SINK = "window"  # "window", "video", "pipe" veya "shm"
+OUTPUT_REGION = "both"  # "both", "ui" veya "camera"
+OUTPUT_FPS = 30
+OUTPUT_VIDEO_PATH = "output.mp4"
+OUTPUT_VIDEO_FOURCC = "mp4v"
+OUTPUT_PIPE_PATH = "/tmp/music_player.bgr"
+OUTPUT_SHM_NAME = "music_player_frame"
+
+# Playback Backend
+PLAYBACK_BACKEND = "spotify"  # "spotify" veya "local"
+LOCAL_MUSIC_DIR = "music"
+LOCAL_AUDIO_EXTENSIONS = (".wav", ".ogg", ".mp3", ".flac")
+LOCAL_OPENING_SECONDS = 10  # Önceden çözülen başlangıç süresi
+LOCAL_OPENING_CACHE_SIZE = 4  # Bellekte tutulan başlangıç sayısı (parçanın tamamı sadece çalan için tutulur)
+LOCAL_PREFETCH_COUNT = 2  # Çalan şarkıdan sonra hazırlanan şarkı sayısı
+LOCAL_MIXER_FREQUENCY = 44100
+LOCAL_MIXER_BUFFER = 512
+
+# Spotify API ("spotify" gerçek API, "fake" gecikme/hata enjekte eden yerel taklit)
+SPOTIFY_API = "spotify"
+FAKE_SPOTIFY_SCENARIO = "healthy"  # models/fake_spotify.py içindeki SCENARIOS
+
+# Multi-session (service/)
+INFERENCE_WORKERS = 2  # Tüm oturumların paylaştığı MediaPipe worker sayısı
+INFERENCE_STATIC_IMAGE_MODE = True  # Ortak grafikler akışlar arası takip durumu tutamaz
+SESSION_COMMAND_INTERVAL = 0.5  # Bir oturumun iki Spotify komutu arasındaki en kısa süre (sn)
+SESSION_COMMAND_QUEUE_SIZE = 8  # Ortak komut thread'inde bekleyebilecek en fazla tıklama
+# Bütün oturumlar tek oynatıcıyı (aynı hesap ve cihaz) paylaşır
+SESSIONS = [
+    {"camera": 0, "sink": "window", "target": None},
+]
+
+# Telemetry
+TELEMETRY_ENABLED = True
+TELEMETRY_FORMAT = "jsonl"  # "jsonl" veya "binary"
+TELEMETRY_DIR = "logs"
+TELEMETRY_MAX_BYTES = 10 * 1024 * 1024  # Bu boyutu aşan günlük dosyası döndürülür
+TELEMETRY_BACKUP_COUNT = 5
+TELEMETRY_BUFFER_SIZE = 8192  # Halka buffer kapasitesi (kayıt)
+TELEMETRY_FLUSH_INTERVAL = 0.5  # Arka plan yazıcısının uyanma aralığı (sn)
+TELEMETRY_BATCH_SIZE = 512
+TELEMETRY_ECHO_ERRORS = True  # Hata kayıtlarını yazıcı thread'inden konsola da bas
+TELEMETRY_SLOW_FRAME_MS = 100  # Bundan uzun süren kareler frame_drop olarak kaydedilir
+
+# Offline annotation (annotate.py)
+ANNOTATE_OUTPUT_DIR = "annotations"
+ANNOTATE_WORKERS = None  # None: işlemci çekirdeği sayısı kadar süreç
+ANNOTATE_CHUNK_FRAMES = 900  # Bir worker'a tek seferde verilen kare sayısı
+ANNOTATE_MAX_FACES = 4  # Kare başına saklanan en fazla yüz kutusu
@@ -0,0 +1,262 @@
+import hashlib
+import multiprocessing
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import cv2
+import numpy as np
+from config import *
+from gesture.tracker import evaluate_gestures, landmarks_to_array
+
+# Her worker sürecinin kendi MediaPipe grafikleri (worker başlarken oluşturulur)
+_models = None
+
+MERGED_COLUMNS = ("frame_index", "timestamp_ms", "hand_count", "landmarks", "handedness", "hand_scores",
+                  "is_pinching", "is_scrolling", "face_count", "face_boxes", "face_scores")
+
+
+class ChunkJob:
+    def __init__(self, video_path, chunk_index, start, stop, output_path):
+        self.video_path = video_path
+        self.chunk_index = chunk_index
+        self.start = start
+        self.stop = stop  # None: videonun sonuna kadar
+        self.output_path = output_path
+
+
+def iter_frames(video_path, start=0, stop=None):
+    # (kare no, zaman ms, BGR kare) üretir; sadece o an işlenen kare bellekte tutulur
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise RuntimeError(f"Video açılamadı: {video_path}")
+    try:
+        if start:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+        index = start
+        while stop is None or index < stop:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield index, cap.get(cv2.CAP_PROP_POS_MSEC), frame
+            index += 1
+    finally:
+        cap.release()
+
+def annotate_frames(frames, hands, face_detection, max_hands=MAX_NUM_HANDS, max_faces=ANNOTATE_MAX_FACES):
+    # Her kare için sabit boyutlu satır üretir; eksik eller/yüzler NaN ve -1 ile doldurulur
+    for index, timestamp_ms, frame in frames:
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        hand_results = hands.process(rgb_frame)
+        face_results = face_detection.process(rgb_frame)
+
+        landmarks = np.full((max_hands, 21, 3), np.nan, np.float32)
+        handedness = np.full(max_hands, -1, np.int8)
+        hand_scores = np.zeros(max_hands, np.float32)
+        is_pinching = np.zeros(max_hands, bool)
+        is_scrolling = np.zeros(max_hands, bool)
+        hand_count = 0
+        if hand_results.multi_hand_landmarks:
+            points = landmarks_to_array(hand_results.multi_hand_landmarks)[:max_hands]
+            hand_count = len(points)
+            landmarks[:hand_count] = points
+            is_pinching[:hand_count], is_scrolling[:hand_count], _ = evaluate_gestures(points)
+            for i, classification in enumerate((hand_results.multi_handedness or [])[:hand_count]):
+                label = classification.classification[0]
+                handedness[i] = 1 if label.label == "Right" else 0
+                hand_scores[i] = label.score
+
+        face_boxes = np.full((max_faces, 4), np.nan, np.float32)
+        face_scores = np.zeros(max_faces, np.float32)
+        detections = (face_results.detections or [])[:max_faces]
+        for i, detection in enumerate(detections):
+            bbox = detection.location_data.relative_bounding_box
+            face_boxes[i] = (bbox.xmin, bbox.ymin, bbox.width, bbox.height)
+            face_scores[i] = detection.score[0] if detection.score else 0.0
+
+        yield {
+            "frame_index": index,
+            "timestamp_ms": timestamp_ms,
+            "hand_count": hand_count,
+            "landmarks": landmarks,
+            "handedness": handedness,
+            "hand_scores": hand_scores,
+            "is_pinching": is_pinching,
+            "is_scrolling": is_scrolling,
+            "face_count": len(detections),
+            "face_boxes": face_boxes,
+            "face_scores": face_scores,
+        }
+
+def collect_columns(rows, max_hands=MAX_NUM_HANDS, max_faces=ANNOTATE_MAX_FACES):
+    # Satırları sütunlara çevir: (N,), (N, el, 21, 3), (N, yüz, 4) ...
+    columns = {
+        "frame_index": ([], np.int32, ()),
+        "timestamp_ms": ([], np.float64, ()),
+        "hand_count": ([], np.uint8, ()),
+        "landmarks": ([], np.float32, (max_hands, 21, 3)),
+        "handedness": ([], np.int8, (max_hands,)),
+        "hand_scores": ([], np.float32, (max_hands,)),
+        "is_pinching": ([], bool, (max_hands,)),
+        "is_scrolling": ([], bool, (max_hands,)),
+        "face_count": ([], np.uint8, ()),
+        "face_boxes": ([], np.float32, (max_faces, 4)),
+        "face_scores": ([], np.float32, (max_faces,)),
+    }
+    for row in rows:
+        for name, (values, _, _) in columns.items():
+            values.append(row[name])
+    return {name: np.array(values, dtype).reshape((len(values),) + shape)
+            for name, (values, dtype, shape) in columns.items()}
+
+def save_npz(path, **arrays):
+    # Yarıda kesilen yazma bitmiş parça gibi görünmesin diye geçici dosya + os.replace
+    tmp_path = path[:-len(".npz")] + ".tmp.npz"
+    np.savez_compressed(tmp_path, **arrays)
+    os.replace(tmp_path, path)
+
+
+def _init_worker(static_image_mode):
+    global _models
+    from gesture.detector import create_models
+
+    # OpenCV'nin kendi thread havuzu süreç sayısıyla yarışmasın
+    cv2.setNumThreads(1)
+    _models = create_models(static_image_mode)
+
+def annotate_chunk(job):
+    hands, face_detection = _models
+    # Takip durumu önceki parçadan (başka bir videodan olabilir) taşınmasın
+    for model in (hands, face_detection):
+        if hasattr(model, "reset"):
+            model.reset()
+
+    start_time = time.perf_counter()
+    frames = iter_frames(job.video_path, job.start, job.stop)
+    columns = collect_columns(annotate_frames(frames, hands, face_detection))
+    elapsed = time.perf_counter() - start_time
+
+    save_npz(job.output_path, start=job.start, **columns)
+    return job, len(columns["frame_index"]), elapsed
+
+
+class BatchAnnotator:
+    # Videoları kare parçalarına böler ve süreç havuzunda işler. Her parça ayrı bir .npz
+    # olarak yazılır; yeniden başlatıldığında yazılmış parçalar atlanır (resume).
+    # Bir videonun bütün parçaları bitince tek bir <video>.npz dosyasında birleştirilir.
+    def __init__(self, output_dir=ANNOTATE_OUTPUT_DIR, workers=ANNOTATE_WORKERS,
+                 chunk_frames=ANNOTATE_CHUNK_FRAMES, static_image_mode=False):
+        self.output_dir = output_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_frames = chunk_frames
+        self.static_image_mode = static_image_mode
+
+    def output_path(self, video_path):
+        # Farklı klasörlerdeki aynı adlı videolar çakışmasın diye ada tam yolun kısa özeti eklenir
+        name = os.path.splitext(os.path.basename(video_path))[0]
+        digest = hashlib.sha1(os.path.abspath(video_path).encode("utf-8")).hexdigest()[:8]
+        return os.path.join(self.output_dir, f"{name}-{digest}.npz")
+
+    def chunk_dir(self, video_path):
+        return self.output_path(video_path)[:-len(".npz")] + ".chunks"
+
+    def plan(self, video_path):
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise RuntimeError(f"Video açılamadı: {video_path}")
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        cap.release()
+
+        chunk_dir = self.chunk_dir(video_path)
+        jobs = []
+        # Dosya adında parça boyu da var; farklı --chunk-frames ile devam edilirse eski parçalar kullanılmaz
+        # Kare sayısı başlıktan okunur ve yanlış olabilir; son parça video bitene kadar okur
+        num_chunks = max(1, -(-frame_count // self.chunk_frames))
+        for chunk_index in range(num_chunks):
+            start = chunk_index * self.chunk_frames
+            stop = start + self.chunk_frames if chunk_index < num_chunks - 1 else None
+            jobs.append(ChunkJob(video_path, chunk_index, start, stop,
+                                 os.path.join(chunk_dir, f"{start:08d}-{self.chunk_frames}.npz")))
+        return jobs, {"fps": fps, "width": width, "height": height, "frame_count": frame_count}
+
+    def run(self, video_paths, progress=print):
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        # Açılamayan video veya hatalı parça bütün işi durdurmaz: kaydedilir ve diğerleri devam eder.
+        # Hatalı parçalar diske yazılmadığı için bir sonraki çalıştırmada tekrar denenir.
+        stats = {"frames": 0, "busy_seconds": 0.0, "chunks": 0, "workers": 0,
+                 "failed_videos": [], "failed_chunks": []}
+        plans = {}
+        pending = []
+        for video_path in video_paths:
+            if os.path.exists(self.output_path(video_path)):
+                progress(f"Atlandı (zaten işlenmiş): {video_path}")
+                continue
+            try:
+                jobs, info = self.plan(video_path)
+            except Exception as e:
+                progress(f"Atlandı (okunamadı): {video_path}: {e}")
+                stats["failed_videos"].append(video_path)
+                continue
+            os.makedirs(self.chunk_dir(video_path), exist_ok=True)
+            plans[video_path] = (jobs, info)
+            todo = [job for job in jobs if not os.path.exists(job.output_path)]
+            if len(todo) < len(jobs):
+                progress(f"Devam ediliyor: {video_path} ({len(jobs) - len(todo)}/{len(jobs)} parça hazır)")
+            pending.extend(todo)
+
+        incomplete = set()
+        wall_start = time.perf_counter()
+        if pending:
+            # Parça sayısı worker sayısından azsa havuz küçülür; FPS gerçek süreç sayısına bölünsün
+            stats["workers"] = min(self.workers, len(pending))
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=stats["workers"], mp_context=context,
+                                     initializer=_init_worker, initargs=(self.static_image_mode,)) as pool:
+                futures = {pool.submit(annotate_chunk, job): job for job in pending}
+                try:
+                    for future in as_completed(futures):
+                        try:
+                            job, frames, elapsed = future.result()
+                        except Exception as e:
+                            job = futures[future]
+                            progress(f"{os.path.basename(job.video_path)} parça {job.chunk_index} başarısız: {e}")
+                            stats["failed_chunks"].append((job.video_path, job.chunk_index))
+                            incomplete.add(job.video_path)
+                            continue
+                        stats["frames"] += frames
+                        stats["busy_seconds"] += elapsed
+                        stats["chunks"] += 1
+                        progress(f"{os.path.basename(job.video_path)} parça {job.chunk_index}: "
+                                 f"{frames} kare, {frames / elapsed if elapsed else 0.0:.1f} kare/sn")
+                except KeyboardInterrupt:
+                    # Bitmiş parçalar diskte kalır, bir sonraki çalıştırma kaldığı yerden devam eder
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    raise
+        stats["wall_seconds"] = time.perf_counter() - wall_start
+
+        for video_path, (jobs, info) in plans.items():
+            if video_path in incomplete:
+                progress(f"Birleştirilmedi (eksik parça var, tekrar çalıştırın): {video_path}")
+                continue
+            try:
+                self.merge(video_path, jobs, info)
+            except Exception as e:
+                progress(f"Birleştirilemedi: {video_path}: {e}")
+                stats["failed_videos"].append(video_path)
+                continue
+            progress(f"Yazıldı: {self.output_path(video_path)}")
+        return stats
+
+    def merge(self, video_path, jobs, info):
+        parts = []
+        for job in jobs:
+            with np.load(job.output_path) as chunk:
+                parts.append({name: chunk[name] for name in MERGED_COLUMNS})
+        merged = {name: np.concatenate([part[name] for part in parts]) for name in MERGED_COLUMNS}
+        save_npz(self.output_path(video_path), video_path=np.array(video_path), fps=info["fps"],
+                 width=info["width"], height=info["height"], pinch_threshold=PINCH_THRESHOLD, **merged)
+        shutil.rmtree(self.chunk_dir(video_path))
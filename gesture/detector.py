@@ -1,36 +1,56 @@
 import cv2
-import mediapipe as mp
-import math
 import numpy as np
 from config import *
+from gesture.tracker import HandTracker, landmarks_to_array
+from ui.overlay import HandOverlayRenderer
+
+def create_models(static_image_mode=False):
+    # MediaPipe yüklemesi yavaş, sadece modeller oluşturulurken import et
+    import mediapipe as mp
+    hands = mp.solutions.hands.Hands(
+        static_image_mode=static_image_mode,
+        min_detection_confidence=MIN_DETECTION_CONFIDENCE,
+        min_tracking_confidence=MIN_TRACKING_CONFIDENCE,
+        max_num_hands=MAX_NUM_HANDS
+    )
+    face_detection = mp.solutions.face_detection.FaceDetection(
+        min_detection_confidence=MIN_DETECTION_CONFIDENCE
+    )
+    return hands, face_detection
+
+def detect(hands, face_detection, frame):
+    # Process the frame for face and hand detection
+    # face_detection=None: yüzler sadece gizlilik bulanıklığı için gerekir, kamera gösterilmiyorsa atlanır
+    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    face_results = face_detection.process(rgb_frame) if face_detection is not None else None
+    return hands.process(rgb_frame), face_results
 
 class GestureDetector:
-    def __init__(self):
+    def __init__(self, load_models=True, session_id=0):
+        import mediapipe as mp
         self.mp_hands = mp.solutions.hands
         self.mp_face = mp.solutions.face_detection
-        self.mp_draw = mp.solutions.drawing_utils
-        self.hands = self.mp_hands.Hands(
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5,
-            max_num_hands=1
-        )
-        self.face_detection = self.mp_face.FaceDetection(
-            min_detection_confidence=0.5
-        )
-        # İmleç yumuşatma için önceki pozisyonları sakla
-        self.prev_cursor_x = None
-        self.prev_cursor_y = None
-        self.smoothing_factor = 0.5  # Yumuşatma faktörü (0-1 arası)
+        # load_models=False: çıkarım ortak bir worker havuzunda yapılır, burada sadece el durumu tutulur
+        if load_models:
+            self.hands, self.face_detection = create_models()
+        else:
+            self.hands, self.face_detection = None, None
+        # Her el için ayrı kimlik, imleç yumuşatma ve hareket durumu
+        self.tracker = HandTracker(session_id=session_id)
+        self.overlay = HandOverlayRenderer()
 
-    def process_frame(self, frame):
+    def process_frame(self, frame, privacy_blur=True):
+        # privacy_blur=False: kamera yarısı çıktıya girmiyorsa bulanıklık hesaplanmaz, kare olduğu gibi döner
+        if not privacy_blur:
+            hand_results, _ = detect(self.hands, None, frame)
+            return hand_results, frame
+        hand_results, face_results = detect(self.hands, self.face_detection, frame)
+        return hand_results, self.apply_privacy_blur(frame, hand_results, face_results)
+
+    def apply_privacy_blur(self, frame, hand_results, face_results):
         # Create a copy of the frame for blurring
         blurred = cv2.GaussianBlur(frame, (55, 55), 0)
         
-        # Process the frame for face and hand detection
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        hand_results = self.hands.process(rgb_frame)
-        face_results = self.face_detection.process(rgb_frame)
-        
         # Create a mask for the face and hands
         mask = np.zeros(frame.shape[:2], dtype=np.uint8)
         
@@ -79,19 +99,20 @@ class GestureDetector:
         result_frame = frame * mask + blurred * (1 - mask)
         result_frame = result_frame.astype(np.uint8)
         
-        return hand_results, result_frame
+        return result_frame
+
+    def update_hands(self, hand_results, frame_width, frame_height):
+        return self.tracker.update(hand_results.multi_hand_landmarks, frame_width, frame_height)
+
+    def get_cursor_owner(self):
+        return self.tracker.get_cursor_owner()
 
     def draw_landmarks(self, frame, hand_landmarks):
-        self.mp_draw.draw_landmarks(
-            frame,
-            hand_landmarks,
-            self.mp_hands.HAND_CONNECTIONS,
-            self.mp_draw.DrawingSpec(color=(0, 0, 255), thickness=2, circle_radius=4),
-            self.mp_draw.DrawingSpec(color=(255, 255, 255), thickness=2, circle_radius=2)
-        )
+        self.overlay.draw_hands(frame, landmarks_to_array([hand_landmarks]))
 
-    def is_finger_extended(self, hand_landmark, finger_tip_id, finger_pip_id):
-        return hand_landmark.landmark[finger_tip_id].y < hand_landmark.landmark[finger_pip_id].y
+    def draw_hands(self, frame, hands):
+        # Bütün eller tek seferde çizilir
+        self.overlay.draw_hands(frame, [hand.points for hand in hands])
 
     def get_hand_orientation(self, hand_landmark):
         wrist = hand_landmark.landmark[self.mp_hands.HandLandmark.WRIST]
@@ -105,69 +126,3 @@ class GestureDetector:
             vertical_orientation = "down"
         
         return vertical_orientation
-
-    def is_scroll_gesture(self, hand_landmark):
-        index_extended = self.is_finger_extended(hand_landmark, self.mp_hands.HandLandmark.INDEX_FINGER_TIP, 
-                                               self.mp_hands.HandLandmark.INDEX_FINGER_PIP)
-        middle_extended = self.is_finger_extended(hand_landmark, self.mp_hands.HandLandmark.MIDDLE_FINGER_TIP,
-                                                self.mp_hands.HandLandmark.MIDDLE_FINGER_PIP)
-        ring_extended = self.is_finger_extended(hand_landmark, self.mp_hands.HandLandmark.RING_FINGER_TIP,
-                                              self.mp_hands.HandLandmark.RING_FINGER_PIP)
-        pinky_extended = self.is_finger_extended(hand_landmark, self.mp_hands.HandLandmark.PINKY_TIP,
-                                               self.mp_hands.HandLandmark.PINKY_PIP)
-
-        if index_extended and middle_extended and not ring_extended and not pinky_extended:
-            index_tip = hand_landmark.landmark[self.mp_hands.HandLandmark.INDEX_FINGER_TIP]
-            middle_tip = hand_landmark.landmark[self.mp_hands.HandLandmark.MIDDLE_FINGER_TIP]
-            
-            finger_distance = math.hypot(index_tip.x - middle_tip.x, index_tip.y - middle_tip.y)
-            return finger_distance < 0.1
-        
-        return False
-
-    def is_pinch_gesture(self, hand_landmark):
-        # İşaret ve başparmak uçlarının konumlarını al
-        thumb_tip = hand_landmark.landmark[self.mp_hands.HandLandmark.THUMB_TIP]
-        index_tip = hand_landmark.landmark[self.mp_hands.HandLandmark.INDEX_FINGER_TIP]
-        
-        # İki parmak arasındaki mesafeyi 2 boyutlu olarak hesapla (x ve y)
-        distance = ((thumb_tip.x - index_tip.x) ** 2 + (thumb_tip.y - index_tip.y) ** 2) ** 0.5
-        
-        return distance < 0.045  # Daha rahat kullanım için threshold değeri artırıldı
-
-    def get_pinch_position(self, hand_landmark, frame_width, frame_height):
-        # İşaret parmağı ve başparmak uçlarının konumlarını al
-        thumb_tip = hand_landmark.landmark[self.mp_hands.HandLandmark.THUMB_TIP]
-        index_tip = hand_landmark.landmark[self.mp_hands.HandLandmark.INDEX_FINGER_TIP]
-        
-        # Pinch pozisyonunu iki parmağın ortası olarak hesapla
-        pinch_x = int((thumb_tip.x + index_tip.x) / 2 * frame_width)
-        pinch_y = int((thumb_tip.y + index_tip.y) / 2 * frame_height)
-        
-        # İki parmak arasındaki mesafeyi 2 boyutlu olarak hesapla
-        distance = ((thumb_tip.x - index_tip.x) ** 2 + (thumb_tip.y - index_tip.y) ** 2) ** 0.5
-        
-        if distance < 0.045:  # Daha rahat kullanım için threshold değeri artırıldı
-            return pinch_x, pinch_y
-        return None, None
-
-    def get_finger_cursor(self, hand_landmark, frame_width, frame_height):
-        index_tip = hand_landmark.landmark[self.mp_hands.HandLandmark.INDEX_FINGER_TIP]
-        
-        # Yeni pozisyonu hesapla
-        new_x = int(index_tip.x * frame_width)
-        new_y = int(index_tip.y * frame_height)
-        
-        # Eğer önceki pozisyon varsa yumuşatma uygula
-        if self.prev_cursor_x is not None and self.prev_cursor_y is not None:
-            cursor_x = int(self.prev_cursor_x + (new_x - self.prev_cursor_x) * self.smoothing_factor)
-            cursor_y = int(self.prev_cursor_y + (new_y - self.prev_cursor_y) * self.smoothing_factor)
-        else:
-            cursor_x = new_x
-            cursor_y = new_y
-        
-        # Yeni pozisyonu sakla
-        self.prev_cursor_x = cursor_x
-        self.prev_cursor_y = cursor_y
-        
-        return cursor_x, cursor_y 
\ No newline at end of file
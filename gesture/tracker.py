@@ -0,0 +1,221 @@
+import numpy as np
+from config import *
+from telemetry import events
+
+# MediaPipe hand landmark indices
+WRIST = 0
+THUMB_TIP = 4
+INDEX_FINGER_PIP = 6
+INDEX_FINGER_TIP = 8
+MIDDLE_FINGER_PIP = 10
+MIDDLE_FINGER_TIP = 12
+RING_FINGER_PIP = 14
+RING_FINGER_TIP = 16
+PINKY_PIP = 18
+PINKY_TIP = 20
+
+FINGER_TIPS = [INDEX_FINGER_TIP, MIDDLE_FINGER_TIP, RING_FINGER_TIP, PINKY_TIP]
+FINGER_PIPS = [INDEX_FINGER_PIP, MIDDLE_FINGER_PIP, RING_FINGER_PIP, PINKY_PIP]
+
+
+def landmarks_to_array(multi_hand_landmarks):
+    # Tüm elleri tek bir (N, 21, 3) diziye çevir
+    return np.array([[(lm.x, lm.y, lm.z) for lm in hand.landmark]
+                     for hand in multi_hand_landmarks], dtype=np.float32).reshape(-1, 21, 3)
+
+
+def hand_bboxes(points):
+    # (N, 4) -> x_min, y_min, x_max, y_max (normalized)
+    return np.concatenate([points[:, :, :2].min(axis=1), points[:, :, :2].max(axis=1)], axis=1)
+
+
+def bbox_iou(boxes_a, boxes_b):
+    x1 = np.maximum(boxes_a[:, None, 0], boxes_b[None, :, 0])
+    y1 = np.maximum(boxes_a[:, None, 1], boxes_b[None, :, 1])
+    x2 = np.minimum(boxes_a[:, None, 2], boxes_b[None, :, 2])
+    y2 = np.minimum(boxes_a[:, None, 3], boxes_b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+    area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+
+def evaluate_gestures(points):
+    # Bütün eller için pinch ve scroll hareketlerini tek seferde hesapla
+    thumb_tip = points[:, THUMB_TIP, :2]
+    index_tip = points[:, INDEX_FINGER_TIP, :2]
+    middle_tip = points[:, MIDDLE_FINGER_TIP, :2]
+
+    pinch_distance = np.linalg.norm(thumb_tip - index_tip, axis=1)
+    is_pinching = pinch_distance < PINCH_THRESHOLD
+    pinch_points = (thumb_tip + index_tip) / 2
+
+    extended = points[:, FINGER_TIPS, 1] < points[:, FINGER_PIPS, 1]
+    finger_distance = np.linalg.norm(index_tip - middle_tip, axis=1)
+    is_scrolling = (extended[:, 0] & extended[:, 1] & ~extended[:, 2] & ~extended[:, 3]
+                    & (finger_distance < 0.1))
+
+    return is_pinching, is_scrolling, pinch_points
+
+
+class HandState:
+    def __init__(self, hand_id):
+        self.hand_id = hand_id
+        self.landmarks = None  # MediaPipe landmark listesi (çizim için)
+        self.points = None
+        self.bbox = None
+        self.cursor_x = None
+        self.cursor_y = None
+        self.pinch_x = None
+        self.pinch_y = None
+        self.is_pinching = False
+        self.is_scrolling = False
+        self.missed_frames = 0
+        self.visible = False
+
+    @property
+    def area(self):
+        if self.bbox is None:
+            return 0.0
+        return float((self.bbox[2] - self.bbox[0]) * (self.bbox[3] - self.bbox[1]))
+
+
+class HandTracker:
+    def __init__(self, smoothing_factor=CURSOR_SMOOTHING, owner_policy=CURSOR_OWNER_POLICY, session_id=0):
+        self.smoothing_factor = smoothing_factor
+        self.session_id = session_id
+        self.owner_policy = owner_policy
+        self.hands = {}
+        self.owner_id = None
+        self._next_id = 0
+
+    def reset(self):
+        self.hands = {}
+        self.owner_id = None
+
+    def update(self, multi_hand_landmarks, frame_width, frame_height):
+        if multi_hand_landmarks:
+            points = landmarks_to_array(multi_hand_landmarks)
+        else:
+            multi_hand_landmarks = []
+            points = np.zeros((0, 21, 3), np.float32)
+
+        assignments = self._associate(points)
+
+        for hand in self.hands.values():
+            hand.visible = False
+
+        if len(points):
+            bboxes = hand_bboxes(points)
+            is_pinching, is_scrolling, pinch_points = evaluate_gestures(points)
+            cursor_points = points[:, INDEX_FINGER_TIP, :2] * (frame_width, frame_height)
+            pinch_points = pinch_points * (frame_width, frame_height)
+
+            for det, hand_id in enumerate(assignments):
+                if hand_id is None:
+                    hand_id = self._next_id
+                    self._next_id += 1
+                    self.hands[hand_id] = HandState(hand_id)
+                    events.emit(events.GESTURE, self.session_id, hand_id, "hand", True)
+                hand = self.hands[hand_id]
+                was_pinching, was_scrolling = hand.is_pinching, hand.is_scrolling
+                hand.landmarks = multi_hand_landmarks[det]
+                hand.points = points[det]
+                hand.bbox = bboxes[det]
+                hand.visible = True
+                hand.missed_frames = 0
+                hand.is_pinching = bool(is_pinching[det])
+                hand.is_scrolling = bool(is_scrolling[det])
+                if hand.is_pinching:
+                    hand.pinch_x, hand.pinch_y = int(pinch_points[det, 0]), int(pinch_points[det, 1])
+                else:
+                    hand.pinch_x, hand.pinch_y = None, None
+                self._smooth_cursor(hand, cursor_points[det])
+                self._emit_transitions(hand, was_pinching, was_scrolling)
+
+        # Kısa süreli kayıplarda kimliği koru, uzun süre görünmeyen elleri sil
+        for hand_id in list(self.hands):
+            hand = self.hands[hand_id]
+            if not hand.visible:
+                was_pinching, was_scrolling = hand.is_pinching, hand.is_scrolling
+                hand.missed_frames += 1
+                hand.is_pinching = False
+                hand.is_scrolling = False
+                hand.pinch_x, hand.pinch_y = None, None
+                self._emit_transitions(hand, was_pinching, was_scrolling)
+                if hand.missed_frames > HAND_LOST_FRAMES:
+                    del self.hands[hand_id]
+                    events.emit(events.GESTURE, self.session_id, hand_id, "hand", False)
+
+        self._update_owner()
+        return self.visible_hands()
+
+    def visible_hands(self):
+        return [hand for hand in self.hands.values() if hand.visible]
+
+    def get_cursor_owner(self):
+        hand = self.hands.get(self.owner_id)
+        if hand is not None and hand.visible:
+            return hand
+        return None
+
+    def _emit_transitions(self, hand, was_pinching, was_scrolling):
+        # Sadece durum değişimleri kaydedilir, her kare değil
+        if hand.is_pinching != was_pinching:
+            events.emit(events.GESTURE, self.session_id, hand.hand_id, "pinch", hand.is_pinching)
+        if hand.is_scrolling != was_scrolling:
+            events.emit(events.GESTURE, self.session_id, hand.hand_id, "scroll", hand.is_scrolling)
+
+    def _smooth_cursor(self, hand, position):
+        new_x, new_y = int(position[0]), int(position[1])
+        if hand.cursor_x is not None and hand.cursor_y is not None:
+            hand.cursor_x = int(hand.cursor_x + (new_x - hand.cursor_x) * self.smoothing_factor)
+            hand.cursor_y = int(hand.cursor_y + (new_y - hand.cursor_y) * self.smoothing_factor)
+        else:
+            hand.cursor_x, hand.cursor_y = new_x, new_y
+
+    def _associate(self, points):
+        # Yeni tespitleri mevcut ellere landmark mesafesi ve bbox örtüşmesiyle eşleştir
+        assignments = [None] * len(points)
+        track_ids = [hand_id for hand_id, hand in self.hands.items() if hand.points is not None]
+        if not len(points) or not track_ids:
+            return assignments
+
+        track_points = np.stack([self.hands[hand_id].points for hand_id in track_ids])
+        distance = np.linalg.norm(track_points[:, None, :, :2] - points[None, :, :, :2], axis=3).mean(axis=2)
+        iou = bbox_iou(hand_bboxes(track_points), hand_bboxes(points))
+        valid = (distance < HAND_MATCH_MAX_DISTANCE) | (iou > HAND_MATCH_MIN_IOU)
+
+        # En yakın çiftlerden başlayarak açgözlü eşleştirme
+        used_tracks, used_detections = set(), set()
+        for flat in np.argsort(distance, axis=None):
+            track, det = np.unravel_index(flat, distance.shape)
+            if not valid[track, det] or track in used_tracks or det in used_detections:
+                continue
+            assignments[det] = track_ids[track]
+            used_tracks.add(track)
+            used_detections.add(det)
+        return assignments
+
+    def _update_owner(self):
+        visible = self.visible_hands()
+        owner = self.hands.get(self.owner_id)
+
+        if self.owner_policy == "largest":
+            # İmleç her karede kameraya en yakın (en büyük) ele geçer
+            if visible:
+                self.owner_id = max(visible, key=lambda hand: hand.area).hand_id
+            return
+
+        if self.owner_policy == "first":
+            # İmleç en eski görünen ele aittir
+            if visible:
+                self.owner_id = min(visible, key=lambda hand: hand.hand_id).hand_id
+            return
+
+        # "sticky": sahibi takip kaybolana kadar imleci tutar
+        if owner is None and visible:
+            self.owner_id = max(visible, key=lambda hand: hand.area).hand_id
+        elif owner is None:
+            self.owner_id = None
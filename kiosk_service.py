@@ -0,0 +1,21 @@
+import os
+from dotenv import load_dotenv
+from config import *
+from service.manager import SessionManager
+
+
+def main():
+    load_dotenv()
+    client_id = os.getenv('SPOTIFY_CLIENT_ID')
+    client_secret = os.getenv('SPOTIFY_CLIENT_SECRET')
+
+    if PLAYBACK_BACKEND == "spotify" and SPOTIFY_API != "fake" and (not client_id or not client_secret):
+        print("Hata: Spotify API bilgileri bulunamadı. Lütfen .env dosyasını kontrol edin.")
+        return
+
+    # config.SESSIONS içindeki her kamera/ekran çifti için bir oturum
+    manager = SessionManager()
+    manager.run(client_id, client_secret)
+
+if __name__ == "__main__":
+    main()
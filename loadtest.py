@@ -0,0 +1,122 @@
+import argparse
+import random
+import time
+import numpy as np
+from config import *
+from main import handle_interactions, update_playback_state
+from models.fake_spotify import SCENARIOS
+from models.song import Song
+from telemetry import events
+from ui.renderer import UIRenderer
+
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) * 1000 if values else 0.0
+
+def button_position(index, pause=False):
+    # handle_interactions ile aynı yerleşim; tıklama UI tarafındaki koordinatlarla yapılır
+    content_x = SIDEBAR_WIDTH + CONTENT_PADDING
+    content_y = TOP_BAR_HEIGHT + CONTENT_PADDING + 100
+    x = content_x + (130 if pause else 40)
+    y = content_y + 120 + index * SONG_ITEM_HEIGHT
+    return CAMERA_WIDTH + x, y
+
+def run_scenario(name, duration, fps, click_interval, seed):
+    Song.initialize_fake(name, seed)
+    try:
+        playlist_songs = Song.get_playlist()
+    except Exception as e:
+        Song.shutdown()
+        return {"scenario": name, "error": f"Playlist yüklenemedi: {e}"}
+
+    renderer = UIRenderer(CAMERA_WIDTH, CAMERA_HEIGHT)
+    frame = np.zeros((CAMERA_HEIGHT, CAMERA_WIDTH, 3), np.uint8)
+    rng = random.Random(seed)
+    frame_budget = 1.0 / fps
+
+    current_song = None
+    last_check = 0
+    frame_times = []
+    command_times = []
+
+    start = time.monotonic()
+    next_click = start + click_interval
+    while time.monotonic() - start < duration:
+        frame_start = time.monotonic()
+
+        # Ana döngüdeki adımlar: çizim, durum sorgusu ve tıklamalar
+        renderer.draw_modern_ui(frame, -1, -1, 0, current_song, playlist_songs)
+        last_check = update_playback_state(current_song, last_check)
+
+        if frame_start >= next_click:
+            pinch_x, pinch_y = button_position(rng.randrange(len(playlist_songs)), pause=rng.random() < 0.3)
+            click_start = time.monotonic()
+            _, current_song = handle_interactions(pinch_x, pinch_y, renderer.menu_items,
+                                                  playlist_songs, 0, current_song)
+            command_times.append(time.monotonic() - click_start)
+            next_click = frame_start + click_interval
+
+        elapsed = time.monotonic() - frame_start
+        frame_times.append(elapsed)
+        if elapsed < frame_budget:
+            time.sleep(frame_budget - elapsed)
+
+    endpoints = Song.get_transport_stats()
+    Song.shutdown()
+    return {
+        "scenario": name,
+        "frames": len(frame_times),
+        "frame_p50_ms": percentile(frame_times, 50),
+        "frame_p95_ms": percentile(frame_times, 95),
+        "frame_p99_ms": percentile(frame_times, 99),
+        "frame_max_ms": max(frame_times) * 1000 if frame_times else 0.0,
+        "frames_over_budget": sum(1 for t in frame_times if t > frame_budget),
+        "clicks": len(command_times),
+        "click_p50_ms": percentile(command_times, 50),
+        "click_p95_ms": percentile(command_times, 95),
+        "click_max_ms": max(command_times) * 1000 if command_times else 0.0,
+        "endpoints": endpoints,
+    }
+
+def print_report(results, fps):
+    print(f"\nKare bütçesi: {1000 / fps:.1f} ms")
+    print(f"{'senaryo':<14}{'kare':>7}{'p50':>8}{'p95':>8}{'p99':>9}{'max':>9}{'bütçe aşımı':>13}"
+          f"{'tık':>6}{'tık p50':>9}{'tık p95':>9}{'tık max':>9}")
+    for result in results:
+        if "error" in result:
+            print(f"{result['scenario']:<14}{result['error']}")
+            continue
+        print(f"{result['scenario']:<14}{result['frames']:>7}{result['frame_p50_ms']:>8.1f}"
+              f"{result['frame_p95_ms']:>8.1f}{result['frame_p99_ms']:>9.1f}{result['frame_max_ms']:>9.1f}"
+              f"{result['frames_over_budget']:>13}{result['clicks']:>6}{result['click_p50_ms']:>9.1f}"
+              f"{result['click_p95_ms']:>9.1f}{result['click_max_ms']:>9.1f}")
+
+    print("\nKomut gidiş-dönüş süreleri (ms):")
+    for result in results:
+        for endpoint, stats in sorted(result.get("endpoints", {}).items()):
+            print(f"  {result['scenario']:<14}{endpoint:<18}çağrı={stats['calls']:<5}hata={stats['errors']:<4}"
+                  f"429={stats['rate_limited']:<4}ort={stats['avg_latency_ms']:7.1f}"
+                  f"  max={stats['max_latency_ms']:7.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Sahte Spotify API ile kontrol yolu yük testi")
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--duration", type=float, default=20.0, help="Senaryo başına süre (sn)")
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--click-interval", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--log", help="Olayları bu dosyaya yaz (telemetry_report.py ile özetlenebilir)")
+    parser.add_argument("--log-format", default=TELEMETRY_FORMAT, choices=["jsonl", "binary"])
+    args = parser.parse_args()
+
+    if args.log:
+        events.start(args.log, args.log_format)
+    try:
+        results = [run_scenario(name, args.duration, args.fps, args.click_interval, args.seed)
+                   for name in args.scenarios]
+    finally:
+        events.stop()
+    print_report(results, args.fps)
+
+if __name__ == "__main__":
+    main()
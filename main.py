@@ -2,7 +2,10 @@ import cv2
 from config import *
 from gesture.detector import GestureDetector
 from ui.renderer import UIRenderer
+from ui.sinks import create_sink
 from models.song import Song
+from startup import StartupOrchestrator
+from telemetry import events
 import os
 from dotenv import load_dotenv
 import time
@@ -19,7 +22,8 @@ def update_scroll_positions(cursor_y, prev_cursor_y, scroll_gesture_active, vert
             return int(max(0, min(vertical_scroll_pos + scroll_amount, CAMERA_HEIGHT * 2)))
     return vertical_scroll_pos
 
-def handle_interactions(cursor_x, cursor_y, menu_items, playlist_songs, vertical_scroll_pos, current_song):
+def handle_interactions(cursor_x, cursor_y, menu_items, playlist_songs, vertical_scroll_pos, current_song,
+                        session_id=0):
     try:
         # Adjust cursor_x to be relative to the UI side
         if cursor_x > CAMERA_WIDTH:
@@ -48,11 +52,13 @@ def handle_interactions(cursor_x, cursor_y, menu_items, playlist_songs, vertical
                         return True, current_song
                     # If same song is paused, resume
                     elif current_song and current_song.title == song.title and not current_song.is_playing:
+                        events.emit(events.CLICK, session_id, cursor_x, cursor_y, "play", song.title, "resume")
                         if current_song.unpause():
                             current_song.is_playing = True
                         return True, current_song
                     # Otherwise play new song
                     else:
+                        events.emit(events.CLICK, session_id, cursor_x, cursor_y, "play", song.title, "play")
                         if current_song:
                             current_song.stop()
                             current_song.is_playing = False
@@ -61,7 +67,7 @@ def handle_interactions(cursor_x, cursor_y, menu_items, playlist_songs, vertical
                             return True, song
                         return True, current_song
                 except Exception as e:
-                    print(f"Song playback error: {e}")
+                    events.error("play_button", e)
                     return True, current_song
 
             # Pause button control - genişletilmiş ve düzeltilmiş tıklama alanı
@@ -73,18 +79,93 @@ def handle_interactions(cursor_x, cursor_y, menu_items, playlist_songs, vertical
                 pause_y - pause_hit_box <= cursor_y <= pause_y + pause_hit_box):
                 try:
                     if current_song and current_song.title == song.title:
+                        events.emit(events.CLICK, session_id, cursor_x, cursor_y, "pause", song.title, "pause")
                         if current_song.pause():
                             current_song.is_playing = False
                     return True, current_song
                 except Exception as e:
-                    print(f"Song pause error: {e}")
+                    events.error("pause_button", e)
                     return True, current_song
         
         return False, current_song
     except Exception as e:
-        print(f"Interaction error: {e}")
+        events.error("handle_interactions", e)
         return False, current_song
 
+def get_owner_controls(owner, actual_width, actual_height):
+    # Başlangıç değerlerini tanımla
+    cursor_x, cursor_y = -1, -1
+    pinch_x, pinch_y = None, None
+    scroll_gesture_active = False
+
+    if owner:
+        # Get cursor position from camera view (left side)
+        cursor_x, cursor_y = owner.cursor_x, owner.cursor_y
+        # Scale coordinates to match the UI dimensions
+        cursor_x = int(cursor_x * (CAMERA_WIDTH / actual_width))
+        cursor_y = int(cursor_y * (CAMERA_HEIGHT / actual_height))
+
+        # Map the cursor from left side to right side
+        cursor_x = CAMERA_WIDTH + cursor_x
+
+        # Get pinch position from camera view (left side)
+        if owner.is_pinching:
+            pinch_x = CAMERA_WIDTH + int(owner.pinch_x * (CAMERA_WIDTH / actual_width))
+            pinch_y = int(owner.pinch_y * (CAMERA_HEIGHT / actual_height))
+
+        # Scroll gesture detection
+        scroll_gesture_active = owner.is_scrolling
+
+    return cursor_x, cursor_y, pinch_x, pinch_y, scroll_gesture_active
+
+def update_playback_state(current_song, last_check):
+    current_time = time.time()
+    poll_interval = PLAYBACK_POLL_INTERVAL
+    if current_song and current_song.clock.has_ended():
+        # Şarkı bitmiş görünüyor, sıradaki durumu daha erken sor
+        poll_interval = PLAYBACK_END_POLL_INTERVAL
+    if not current_song or (current_time - last_check) < poll_interval:
+        return last_check
+
+    try:
+        request_start = time.monotonic()
+        current_playback = Song.current_playback()
+        sampled_at = (request_start + time.monotonic()) / 2
+        if current_playback and current_playback['item']:
+            current_song.sync_playback(current_playback['progress_ms'],
+                                       current_playback['is_playing'],
+                                       current_playback['item']['duration_ms'],
+                                       sampled_at,
+                                       current_playback['item'].get('uri'))
+        else:
+            current_song.sync_playback(None, False)
+    except Exception as e:
+        events.error("playback_state", e)
+    return current_time
+
+def open_camera(camera_index=0):
+    cap = cv2.VideoCapture(camera_index)
+    
+    # Try to set camera resolution
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, CAMERA_WIDTH)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, CAMERA_HEIGHT)
+    
+    # Get actual camera resolution
+    actual_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    actual_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    if (actual_width, actual_height) != (CAMERA_WIDTH, CAMERA_HEIGHT):
+        events.emit(events.QUALITY, f"camera{camera_index}", "resolution",
+                    f"{actual_width}x{actual_height} (istenen {CAMERA_WIDTH}x{CAMERA_HEIGHT})")
+    return cap, actual_width, actual_height
+
+def load_playlist(client_id, client_secret):
+    # Çalma backend'ini (Spotify veya yerel dosyalar) başlat ve playlist'i yükle
+    if PLAYBACK_BACKEND == "local":
+        Song.initialize_local()
+    else:
+        Song.initialize_spotify(client_id, client_secret)
+    return Song.get_playlist()
+
 def main():
     # Load environment variables
     load_dotenv()
@@ -93,35 +174,35 @@ def main():
     CLIENT_ID = os.getenv('SPOTIFY_CLIENT_ID')
     CLIENT_SECRET = os.getenv('SPOTIFY_CLIENT_SECRET')
     
-    if not CLIENT_ID or not CLIENT_SECRET:
+    if PLAYBACK_BACKEND == "spotify" and SPOTIFY_API != "fake" and (not CLIENT_ID or not CLIENT_SECRET):
         print("Hata: Spotify API bilgileri bulunamadı. Lütfen .env dosyasını kontrol edin.")
         return
     
-    # Spotify API'sini başlat
-    Song.initialize_spotify(CLIENT_ID, CLIENT_SECRET)
+    # Olay kayıtları arka planda logs/ altına yazılır
+    if TELEMETRY_ENABLED:
+        events.start()
     
-    # Playlist'i yükle
-    playlist_songs = Song.get_playlist()
+    # Kamera, model ve playlist paralel olarak başlatılır
+    orchestrator = StartupOrchestrator()
+    orchestrator.submit("camera", open_camera)
+    orchestrator.submit("models", GestureDetector)
+    orchestrator.submit("playlist", load_playlist, CLIENT_ID, CLIENT_SECRET)
     
-    # Renderer ve GestureDetector'ı başlat
     renderer = UIRenderer(CAMERA_WIDTH, CAMERA_HEIGHT)
-    detector = GestureDetector()
+    detector = None
+    models_loaded = False
+    playlist_songs = []
+    playlist_loaded = False
     
-    # Initialize camera
-    cap = cv2.VideoCapture(0)
+    # Kamera hazır olur olmaz görüntü göstermeye başla
+    cap, actual_width, actual_height = orchestrator.result("camera")
     
-    # Try to set camera resolution
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, CAMERA_WIDTH)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, CAMERA_HEIGHT)
-    
-    # Get actual camera resolution
-    actual_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-    actual_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-    
-    # Create window with double width for split view
-    cv2.namedWindow("Modern Music Player", cv2.WINDOW_NORMAL)
-    cv2.resizeWindow("Modern Music Player", actual_width * 2, actual_height)
-    fullscreen = False
+    # Çıktı hedefi: pencere, video dosyası, named pipe veya shared memory
+    halves = 2 if OUTPUT_REGION == "both" else 1
+    # Sadece arayüz yayınlanıyorsa kamera yarısı (bulanıklık, el çizimi) hiç hesaplanmaz
+    show_camera = OUTPUT_REGION != "ui"
+    sink = create_sink(OUTPUT_SINK, window_size=(actual_width * halves, actual_height))
+    sink.open(*renderer.canvas_size(OUTPUT_REGION))
 
     # Initialize components with actual resolution
     current_song = None  # Başlangıçta çalan şarkı yok
@@ -129,10 +210,11 @@ def main():
     # Initialize state
     vertical_scroll_pos = 0
     prev_cursor_x, prev_cursor_y = -1, -1
+    prev_owner_id = None
     
     # Spotify durumu kontrolü için zamanlayıcı
+    # İlerleme çubuğu yerel saatle akar, poll sadece saati düzeltir
     last_spotify_check = 0
-    SPOTIFY_CHECK_INTERVAL = 1.0  # Her 1 saniyede bir kontrol et
 
     # Ana döngü
     try:
@@ -140,51 +222,54 @@ def main():
             ret, frame = cap.read()
             if not ret:
                 break
+            frame_start = time.monotonic()
 
             frame = cv2.flip(frame, 1)
-            result, processed_frame = detector.process_frame(frame)
-
-            # Başlangıç değerlerini tanımla
-            cursor_x, cursor_y = -1, -1
-            pinch_x, pinch_y = None, None
-            scroll_gesture_active = False
-
-            if result.multi_hand_landmarks:
-                hand_landmark = result.multi_hand_landmarks[0]
-                detector.draw_landmarks(processed_frame, hand_landmark)
-
-                # Get cursor position from camera view (left side)
-                cursor_x, cursor_y = detector.get_finger_cursor(hand_landmark, actual_width, actual_height)
-                if cursor_x != -1 and cursor_y != -1:
-                    # Scale coordinates to match the UI dimensions
-                    cursor_x = int(cursor_x * (CAMERA_WIDTH / actual_width))
-                    cursor_y = int(cursor_y * (CAMERA_HEIGHT / actual_height))
-                    
-                    # Map the cursor from left side to right side
-                    ui_cursor_x = CAMERA_WIDTH + cursor_x  # Add CAMERA_WIDTH to move to right side
-                    
-                    # For UI interactions, use the mapped coordinates
-                    cursor_x = ui_cursor_x
-                
-                # Get pinch position from camera view (left side)
-                pinch_x, pinch_y = detector.get_pinch_position(hand_landmark, actual_width, actual_height)
-                if pinch_x is not None and pinch_y is not None:
-                    # Scale coordinates to match the UI dimensions
-                    pinch_x = int(pinch_x * (CAMERA_WIDTH / actual_width))
-                    pinch_y = int(pinch_y * (CAMERA_HEIGHT / actual_height))
-                    
-                    # Map the pinch from left side to right side
-                    ui_pinch_x = CAMERA_WIDTH + pinch_x  # Add CAMERA_WIDTH to move to right side
-                    
-                    # For UI interactions, use the mapped coordinates
-                    pinch_x = ui_pinch_x
-                
-                # Scroll gesture detection
-                scroll_gesture_active = detector.is_scroll_gesture(hand_landmark)
+            orchestrator.mark("first_frame")
+
+            # Arka planda yüklenen bileşenleri hazır oldukça devreye al
+            if not models_loaded and orchestrator.ready("models"):
+                models_loaded = True
+                try:
+                    detector = orchestrator.result("models")
+                except Exception as e:
+                    # Model yüklenemezse uygulama el takibi olmadan kamera görüntüsüyle devam eder
+                    events.error("models", f"El takibi modeli yüklenemedi: {e}")
+            if not playlist_loaded and orchestrator.ready("playlist"):
+                playlist_loaded = True
+                try:
+                    playlist_songs = orchestrator.result("playlist")
+                except Exception as e:
+                    events.error("playlist", f"Playlist yüklenemedi: {e}")
+            if orchestrator.all_ready():
+                orchestrator.mark("ready")
+                orchestrator.report()
+
+            # Tüm elleri takip et, imleç sadece sahibi olan elden gelir
+            if detector is not None:
+                result, processed_frame = detector.process_frame(frame, privacy_blur=show_camera)
+                hands = detector.update_hands(result, actual_width, actual_height)
+            else:
+                # Model yüklenene kadar sadece kamera görüntüsünü göster
+                processed_frame = frame
+                hands = []
+            if hands and show_camera:
+                detector.draw_hands(processed_frame, hands)
+
+            owner = detector.get_cursor_owner() if detector is not None else None
+            owner_id = owner.hand_id if owner else None
+            if owner_id != prev_owner_id:
+                # İmleç başka bir ele geçtiyse scroll farkını sıfırla
+                prev_cursor_x, prev_cursor_y = -1, -1
+                prev_owner_id = owner_id
+
+            cursor_x, cursor_y, pinch_x, pinch_y, scroll_gesture_active = get_owner_controls(
+                owner, actual_width, actual_height)
 
             # Draw the UI with both camera feed and interface
             canvas = renderer.draw_modern_ui(processed_frame, cursor_x, cursor_y, vertical_scroll_pos, 
-                                          current_song, playlist_songs, pinch_x is not None)
+                                          current_song, playlist_songs, pinch_x is not None,
+                                          region=OUTPUT_REGION, out=sink.acquire())
 
             # İmleç görüntüleme ve scroll işlemleri
             if cursor_x != -1 and cursor_y != -1:
@@ -193,18 +278,7 @@ def main():
                                                                scroll_gesture_active, vertical_scroll_pos)
             
             # Şarkı durumunu belirli aralıklarla güncelle
-            current_time = time.time()
-            if current_song and (current_time - last_spotify_check) >= SPOTIFY_CHECK_INTERVAL:
-                try:
-                    current_playback = Song.spotify.current_playback()
-                    if current_playback and current_playback['item']:
-                        current_song.is_playing = current_playback['is_playing']
-                        current_song.progress = current_playback['progress_ms'] / current_playback['item']['duration_ms']
-                    else:
-                        current_song.is_playing = False
-                except Exception as e:
-                    print(f"Spotify playback error: {e}")
-                last_spotify_check = current_time
+            last_spotify_check = update_playback_state(current_song, last_spotify_check)
             
             # Pinch (tıklama) kontrolü - imleçten bağımsız
             if pinch_x is not None and pinch_y is not None:
@@ -213,23 +287,22 @@ def main():
 
             prev_cursor_x, prev_cursor_y = cursor_x, cursor_y
 
-            cv2.imshow("Modern Music Player", canvas)
-            key = cv2.waitKey(1)
+            sink.write(canvas)
+            frame_ms = (time.monotonic() - frame_start) * 1000
+            if frame_ms > TELEMETRY_SLOW_FRAME_MS:
+                events.emit(events.FRAME_DROP, 0, "main_loop", frame_ms)
+            key = sink.poll_key()
             if key == ord("q"):
                 break
             elif key == ord("f"):
-                fullscreen = not fullscreen
-                if fullscreen:
-                    cv2.setWindowProperty("Modern Music Player", cv2.WND_PROP_FULLSCREEN, 
-                                        cv2.WINDOW_FULLSCREEN)
-                else:
-                    cv2.setWindowProperty("Modern Music Player", cv2.WND_PROP_FULLSCREEN, 
-                                        cv2.WINDOW_NORMAL)
+                sink.toggle_fullscreen()
     except KeyboardInterrupt:
         print("\nUygulama kapatılıyor...")
-
-    cap.release()
-    cv2.destroyAllWindows()
+    finally:
+        orchestrator.shutdown()
+        cap.release()
+        sink.close()
+        events.stop()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,111 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import warnings
+from spotipy.cache_handler import CacheHandler
+from config import *
+
+
+class AtomicCacheFileHandler(CacheHandler):
+    def __init__(self, cache_path=TOKEN_CACHE_PATH):
+        self.cache_path = cache_path
+
+    def get_cached_token(self):
+        try:
+            with open(self.cache_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def save_token_to_cache(self, token_info):
+        # Önce geçici dosyaya yaz, sonra tek adımda değiştir; yarım dosya kalmaz
+        directory = os.path.dirname(os.path.abspath(self.cache_path))
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(prefix=".cache-", dir=directory)
+            with os.fdopen(fd, "w", encoding='utf-8') as f:
+                json.dump(token_info, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            if tmp_path:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+            print(f"Token önbelleğe yazılamadı: {self.cache_path}")
+
+
+class TokenManager:
+    def __init__(self, oauth, refresh_margin=TOKEN_REFRESH_MARGIN, retry_interval=TOKEN_REFRESH_RETRY):
+        self.oauth = oauth
+        self.refresh_margin = refresh_margin
+        self.retry_interval = retry_interval
+        self._token_info = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self):
+        # İlk açılışta token senkron alınır (gerekirse tarayıcıyla yetkilendirme)
+        # validate_token kapsamı (scope) kontrol eder ve süresi dolmuşsa yeniler
+        token_info = self.oauth.validate_token(self.oauth.cache_handler.get_cached_token())
+        if not token_info:
+            # Token diskten geri okunmaz; önbellek yazılamasa da (salt okunur imaj) bellekteki kullanılır
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", DeprecationWarning)
+                token_info = self.oauth.get_access_token(as_dict=True, check_cache=False)
+        if not token_info:
+            raise RuntimeError("Spotify token alınamadı")
+        self._set_token(token_info)
+
+        self._thread = threading.Thread(target=self._refresh_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def get_access_token(self, as_dict=False):
+        # spotipy her istekte bunu çağırır; asla ağa çıkmaz, sadece bellekteki token döner
+        with self._lock:
+            token_info = self._token_info
+        if token_info is None:
+            raise RuntimeError("Spotify token henüz alınmadı")
+        return dict(token_info) if as_dict else token_info['access_token']
+
+    def seconds_until_expiry(self):
+        with self._lock:
+            if self._token_info is None:
+                return 0
+            return self._token_info['expires_at'] - time.time()
+
+    def refresh_now(self):
+        # Spotify token'ı reddetti (401); süresini ve tekrar deneme aralığını beklemeden yenile
+        self._wake.set()
+
+    def _set_token(self, token_info):
+        with self._lock:
+            self._token_info = token_info
+
+    def _refresh_loop(self):
+        while not self._stop.is_set():
+            delay = max(0, self.seconds_until_expiry() - self.refresh_margin)
+            self._wake.wait(delay)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                with self._lock:
+                    refresh_token = self._token_info['refresh_token']
+                # refresh_access_token sonucu cache_handler üzerinden atomik olarak diske yazar
+                self._set_token(self.oauth.refresh_access_token(refresh_token))
+            except Exception as e:
+                print(f"Spotify token yenilenemedi: {e}")
+                # refresh_now() bu beklemeyi de keser
+                self._wake.wait(self.retry_interval)
@@ -0,0 +1,360 @@
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from config import *
+from telemetry import events
+
+
+class PlaybackBackend:
+    def can_play(self, song):
+        raise NotImplementedError
+
+    def play(self, song):
+        raise NotImplementedError
+
+    def pause(self, song):
+        raise NotImplementedError
+
+    def unpause(self, song):
+        raise NotImplementedError
+
+    def stop(self, song):
+        return self.pause(song)
+
+    def current_playback(self):
+        # Spotify current_playback() ile aynı biçimde sözlük döner
+        return None
+
+    def prefetch(self, songs):
+        pass
+
+
+class SpotifyBackend(PlaybackBackend):
+    def __init__(self, spotify, transport):
+        self.spotify = spotify
+        self.transport = transport
+
+    def can_play(self, song):
+        return song.spotify_uri is not None
+
+    def play(self, song):
+        # Device ID arka planda yenilenir; henüz yoksa bir kez senkron sor
+        device_id = self.transport.device_id or self.transport.refresh_devices(self.spotify)
+        if not device_id:
+            return False
+        self.transport.call(
+            "start_playback",
+            self.spotify.start_playback,
+            device_id=device_id,
+            uris=[song.spotify_uri]
+        )
+        return True
+
+    def pause(self, song):
+        self.transport.call("pause_playback", self.spotify.pause_playback)
+        return True
+
+    def unpause(self, song):
+        self.transport.call("start_playback", self.spotify.start_playback)
+        return True
+
+    def current_playback(self):
+        return self.transport.call("current_playback", self.spotify.current_playback)
+
+
+class MappedAudioFile:
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self.data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.pcm_format = None  # (frequency, channels, sample_width) - sadece PCM WAV için
+        self.pcm_start = 0
+        self.pcm_end = 0
+        self._parse_wav()
+
+    def _parse_wav(self):
+        if self.data[:4] != b"RIFF" or self.data[8:12] != b"WAVE":
+            return
+        offset = 12
+        fmt = None
+        while offset + 8 <= len(self.data):
+            chunk_id, chunk_size = struct.unpack_from("<4sI", self.data, offset)
+            body = offset + 8
+            if chunk_id == b"fmt ":
+                audio_format, channels, frequency = struct.unpack_from("<HHI", self.data, body)
+                bits = struct.unpack_from("<H", self.data, body + 14)[0]
+                if audio_format == 1:
+                    fmt = (frequency, channels, bits // 8)
+            elif chunk_id == b"data" and fmt:
+                self.pcm_format = fmt
+                self.pcm_start = body
+                self.pcm_end = min(body + chunk_size, len(self.data))
+                return
+            offset = body + chunk_size + (chunk_size & 1)
+
+    @property
+    def duration_ms(self):
+        if not self.pcm_format:
+            return None
+        frequency, channels, sample_width = self.pcm_format
+        return (self.pcm_end - self.pcm_start) * 1000 // (frequency * channels * sample_width)
+
+    def pcm_slice(self, start, end=None):
+        end = self.pcm_end if end is None else min(self.pcm_start + end, self.pcm_end)
+        return memoryview(self.data)[self.pcm_start + start:end]
+
+    def open_mapping(self):
+        # pygame okuduğu dosya nesnesini kapattığı için her çözümlemede ayrı bir mapping verilir
+        return mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self):
+        self.data.close()
+        self._file.close()
+
+
+class LocalFileBackend(PlaybackBackend):
+    # Şarkının ilk saniyeleri önceden çözülüp bellekte tutulur; tıklamada sadece
+    # bu kısım çalmaya başlar, kalanı arka planda hazırlanıp kanala sıraya eklenir.
+    # Tıklama yolunda asla çözümleme yapılmaz: başlangıç hazır değilse arka planda
+    # hazırlanır ve hazır olunca çalmaya başlar.
+    def __init__(self, music_dir=LOCAL_MUSIC_DIR, opening_seconds=LOCAL_OPENING_SECONDS,
+                 cache_size=LOCAL_OPENING_CACHE_SIZE):
+        import pygame
+
+        self.pygame = pygame
+        pygame.mixer.init(frequency=LOCAL_MIXER_FREQUENCY, size=-16, channels=2, buffer=LOCAL_MIXER_BUFFER)
+        self.mixer_format = pygame.mixer.get_init()
+        self.frame_bytes = self.mixer_format[2] * 2
+        self.music_dir = music_dir
+        self.opening_seconds = opening_seconds
+        self.cache_size = cache_size
+
+        self.channel = pygame.mixer.Channel(0)
+        self._files = {}
+        self._openings = OrderedDict()  # path -> Sound (LRU)
+        # (path, ham PCM): WAV dışı dosyalarda tamamı sadece tıklanan parça için tutulur (_queue_rest için);
+        # prefetch edilen parçaların sadece başlangıcı önbellekte kalır
+        self._decoded = None
+        self._pending = {}  # path -> başlangıcı hazırlayan future
+        self._durations = {}
+        # Önbellekler ve çalma durumu (kanal, _generation, _current, _starting) bu kilitle korunur;
+        # başlangıç decode thread'inde, durdurma/duraklatma ana thread'de yapılır
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audio-decode")
+
+        self._current = None
+        self._starting = False
+        self._started_at = 0.0
+        self._paused_at = None
+        self._paused_total = 0.0
+        self._generation = 0
+
+    def find_file(self, title, artist):
+        for extension in LOCAL_AUDIO_EXTENSIONS:
+            path = os.path.join(self.music_dir, f"{artist} - {title}{extension}")
+            if os.path.exists(path):
+                return path
+        return None
+
+    def duration_ms(self, path):
+        if path not in self._durations:
+            self._durations[path] = self._mapped(path).duration_ms
+        return self._durations[path]
+
+    def can_play(self, song):
+        return song.local_path is not None
+
+    def play(self, song):
+        path = song.local_path
+        opening = self._cached_opening(path)
+        if opening is None and self._is_native(self._mapped(path)):
+            # Mikser formatındaki WAV'ın başlangıcı mmap'ten kopyalanır, çözümleme gerekmez
+            opening = self._get_opening(path)
+
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            self._current = song
+            self._started_at = time.monotonic()
+            self._paused_at = None
+            self._paused_total = 0.0
+            self._starting = opening is None
+            if self._decoded is not None and self._decoded[0] != path:
+                self._decoded = None
+
+        if opening is not None:
+            self._start(path, opening, generation)
+        else:
+            self._opening_future(path).add_done_callback(
+                lambda future: self._start_when_ready(path, future, generation))
+        return True
+
+    def pause(self, song):
+        with self._lock:
+            if self._current is song and self._paused_at is None:
+                if not self._starting:
+                    self.channel.pause()
+                self._paused_at = time.monotonic()
+        return True
+
+    def unpause(self, song):
+        if self._current is not song:
+            return self.play(song)
+        with self._lock:
+            if self._paused_at is not None:
+                if not self._starting:
+                    self.channel.unpause()
+                self._paused_total += time.monotonic() - self._paused_at
+                self._paused_at = None
+        return True
+
+    def stop(self, song):
+        with self._lock:
+            if self._current is song:
+                self._generation += 1
+                self._starting = False
+                self.channel.stop()
+                self._current = None
+                self._decoded = None
+        return True
+
+    def current_playback(self):
+        song = self._current
+        if song is None:
+            return None
+        if self._starting:
+            # Başlangıç hâlâ hazırlanıyor; çalıyor say ki poll şarkıyı durdurulmuş göstermesin
+            return {
+                'is_playing': self._paused_at is None,
+                'progress_ms': 0,
+                'item': {'uri': song.local_path, 'duration_ms': song.duration_ms or 0},
+            }
+        is_playing = self._paused_at is None and self.channel.get_busy()
+        now = self._paused_at if self._paused_at is not None else time.monotonic()
+        progress_ms = int((now - self._started_at - self._paused_total) * 1000)
+        duration_ms = song.duration_ms or self.duration_ms(song.local_path) or 0
+        return {
+            'is_playing': bool(is_playing),
+            'progress_ms': min(progress_ms, duration_ms) if duration_ms else progress_ms,
+            'item': {'uri': song.local_path, 'duration_ms': duration_ms},
+        }
+
+    def prefetch(self, songs):
+        for song in songs:
+            if song.local_path and song.local_path not in self._openings:
+                self._opening_future(song.local_path)
+
+    def _start(self, path, opening, generation):
+        # Decode thread'inden de çağrılır; kontrol ile channel.play arasında stop() araya giremez
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._starting = False
+            self.channel.play(opening)
+            self._started_at = time.monotonic()
+            self._paused_total = 0.0
+            if self._paused_at is not None:
+                # Hazırlanırken duraklatıldı; baştan duraklatılmış olarak başla
+                self.channel.pause()
+                self._paused_at = self._started_at
+
+        # Şarkının kalanını arka planda hazırla ve kesintisiz devam etmesi için sıraya ekle
+        self._executor.submit(self._queue_rest, path, opening.get_length(), generation)
+
+    def _start_when_ready(self, path, future, generation):
+        try:
+            opening = future.result()
+        except Exception as e:
+            events.error("local_playback", f"{os.path.basename(path)} çözümlenemedi: {e}")
+            with self._lock:
+                if generation == self._generation:
+                    self._starting = False
+                    self._current = None
+            return
+        self._start(path, opening, generation)
+
+    def _opening_future(self, path):
+        # Aynı dosya için ikinci bir çözümleme başlatma (ör. prefetch sürerken tıklama)
+        with self._lock:
+            future = self._pending.get(path)
+            if future is None:
+                future = self._executor.submit(self._get_opening, path)
+                self._pending[path] = future
+                future.add_done_callback(lambda _: self._pending.pop(path, None))
+            return future
+
+    def _cached_opening(self, path):
+        with self._lock:
+            if path in self._openings:
+                self._openings.move_to_end(path)
+                return self._openings[path]
+        return None
+
+    def _is_native(self, audio):
+        return audio.pcm_format == (self.mixer_format[0], self.mixer_format[2], 2)
+
+    def _mapped(self, path):
+        with self._lock:
+            if path not in self._files:
+                self._files[path] = MappedAudioFile(path)
+            return self._files[path]
+
+    def _opening_bytes(self):
+        return int(self.opening_seconds * self.mixer_format[0]) * self.frame_bytes
+
+    def _get_opening(self, path):
+        opening = self._cached_opening(path)
+        if opening is not None:
+            return opening
+
+        audio = self._mapped(path)
+        decoded = None
+        if self._is_native(audio):
+            # Mikser ile aynı formattaki WAV: çözümleme yok, mmap'ten doğrudan kopyalanır
+            opening = self.pygame.mixer.Sound(buffer=audio.pcm_slice(0, self._opening_bytes()))
+        else:
+            # pygame kısmi çözümleme yapamaz; parça bir kez çözülür. Tıklanan parçaysa kalanı
+            # _queue_rest için saklanır, prefetch ise sadece başlangıç tutulur
+            decoded = self._decode(path, audio)
+            opening = self.pygame.mixer.Sound(buffer=decoded[:self._opening_bytes()])
+
+        with self._lock:
+            self._openings[path] = opening
+            if decoded is not None and self._current is not None and self._current.local_path == path:
+                self._decoded = (path, decoded)
+            while len(self._openings) > self.cache_size:
+                self._openings.popitem(last=False)
+        return opening
+
+    def _decode(self, path, audio):
+        full = self.pygame.mixer.Sound(file=audio.open_mapping())
+        self._durations[path] = int(full.get_length() * 1000)
+        return full.get_raw()
+
+    def _queue_rest(self, path, opening_length, generation):
+        if generation != self._generation:
+            return
+        audio = self._mapped(path)
+        offset = int(opening_length * self.mixer_format[0]) * self.frame_bytes
+        if self._is_native(audio):
+            data = audio.pcm_slice(offset)
+        else:
+            decoded = None
+            with self._lock:
+                if self._decoded is not None and self._decoded[0] == path:
+                    decoded = self._decoded[1]
+                    self._decoded = None
+            if decoded is None:
+                # Başlangıç prefetch ile hazırlanmıştı; kalan için arka planda yeniden çöz
+                decoded = self._decode(path, audio)
+            data = decoded[offset:]
+        if not len(data) or generation != self._generation:
+            return
+        rest = self.pygame.mixer.Sound(buffer=data)
+        with self._lock:
+            if generation == self._generation:
+                self.channel.queue(rest)
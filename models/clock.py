@@ -0,0 +1,83 @@
+import time
+from config import *
+
+
+class PlaybackClock:
+    def __init__(self, duration_ms=None):
+        self.duration_ms = duration_ms
+        self.running = False
+        self._anchor_ms = 0.0
+        self._anchor_time = time.monotonic()
+        # Küçük sapmalar bir anda değil, belirli bir süreye yayılarak düzeltilir
+        self._correction_ms = 0.0
+        self._slew_ms = CLOCK_SLEW_MS
+
+    def position_ms(self, now=None):
+        if now is None:
+            now = time.monotonic()
+        position = self._anchor_ms
+        if self.running:
+            elapsed_ms = (now - self._anchor_time) * 1000
+            position += elapsed_ms + self._correction_ms * min(1.0, elapsed_ms / self._slew_ms)
+        else:
+            position += self._correction_ms
+        if self.duration_ms:
+            position = min(position, self.duration_ms)
+        return max(0.0, position)
+
+    @property
+    def progress(self):
+        if not self.duration_ms:
+            return 0.0
+        return self.position_ms() / self.duration_ms
+
+    def has_ended(self, now=None):
+        return bool(self.running and self.duration_ms and self.position_ms(now) >= self.duration_ms)
+
+    def start(self, position_ms=0):
+        self._anchor(position_ms)
+        self.running = True
+
+    def pause(self):
+        self._anchor(self.position_ms())
+        self.running = False
+
+    def resume(self):
+        self._anchor(self.position_ms())
+        self.running = True
+
+    def reset(self):
+        self._anchor(0)
+        self.running = False
+
+    def seek(self, position_ms):
+        self._anchor(position_ms)
+
+    def sync(self, progress_ms, is_playing, duration_ms=None, sampled_at=None):
+        # Sunucudan gelen yeni örnekle yerel saati düzelt
+        if duration_ms:
+            self.duration_ms = duration_ms
+        if sampled_at is None:
+            sampled_at = time.monotonic()
+
+        if not (is_playing and self.running):
+            self._anchor(progress_ms, sampled_at)
+            self.running = is_playing
+            return
+
+        predicted = self.position_ms(sampled_at)
+        error = progress_ms - predicted
+        if abs(error) > CLOCK_SNAP_THRESHOLD_MS:
+            # Büyük fark: kullanıcı başka yerden sardı veya şarkı değişti
+            self._anchor(progress_ms, sampled_at)
+        else:
+            # Geri gitmemesi için düzeltme süresi en az hata kadar uzun tutulur
+            self._anchor(predicted, sampled_at)
+            self._correction_ms = error
+            self._slew_ms = max(CLOCK_SLEW_MS, abs(error) * 2)
+
+    def _anchor(self, position_ms, at=None):
+        self._anchor_ms = float(position_ms)
+        self._anchor_time = time.monotonic() if at is None else at
+        self._correction_ms = 0.0
+        self._slew_ms = CLOCK_SLEW_MS
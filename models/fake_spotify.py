@@ -0,0 +1,266 @@
+import json
+import random
+import threading
+import time
+from collections import deque
+from urllib.parse import parse_qs, urlparse
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from spotipy.cache_handler import MemoryCacheHandler
+from spotipy.oauth2 import SpotifyOauthError
+
+
+class LatencyModel:
+    # kind: "constant" (ms), "uniform" (min_ms, max_ms) veya "lognormal" (median_ms, sigma)
+    def __init__(self, kind="constant", *params):
+        self.kind = kind
+        self.params = params or (0,)
+
+    def sample(self, rng):
+        if self.kind == "constant":
+            return self.params[0] / 1000
+        if self.kind == "uniform":
+            return rng.uniform(*self.params) / 1000
+        if self.kind == "lognormal":
+            median_ms, sigma = self.params
+            return rng.lognormvariate(0, sigma) * median_ms / 1000
+        raise ValueError(f"Bilinmeyen gecikme modeli: {self.kind}")
+
+
+class FakeScenario:
+    def __init__(self, name, latency=None, endpoint_latency=None, error_rate=0.0, error_status=503,
+                 rate_limit=None, retry_after=1, devices=True, token_ttl=3600, token_error_rate=0.0):
+        self.name = name
+        self.latency = latency or LatencyModel("constant", 20)
+        self.endpoint_latency = endpoint_latency or {}
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rate_limit = rate_limit  # (istek sayısı, pencere saniye) veya None
+        self.retry_after = retry_after
+        self.devices = devices
+        self.token_ttl = token_ttl  # Verilen token'ların ömrü (sn)
+        self.token_error_rate = token_error_rate  # Token alma/yenileme hata oranı
+
+    def latency_for(self, endpoint):
+        return self.endpoint_latency.get(endpoint, self.latency)
+
+
+SCENARIOS = {
+    "healthy": FakeScenario("healthy", LatencyModel("lognormal", 40, 0.3)),
+    "slow_start": FakeScenario("slow_start", LatencyModel("lognormal", 40, 0.3),
+                               endpoint_latency={"start_playback": LatencyModel("uniform", 1500, 2500)}),
+    "rate_limited": FakeScenario("rate_limited", LatencyModel("lognormal", 40, 0.3),
+                                 rate_limit=(8, 10.0), retry_after=3),
+    "flaky": FakeScenario("flaky", LatencyModel("lognormal", 80, 0.8), error_rate=0.2),
+    "no_devices": FakeScenario("no_devices", LatencyModel("lognormal", 40, 0.3), devices=False),
+    "timeouts": FakeScenario("timeouts", LatencyModel("lognormal", 40, 0.3),
+                             endpoint_latency={"current_playback": LatencyModel("lognormal", 800, 1.5)}),
+    "token_refresh": FakeScenario("token_refresh", LatencyModel("lognormal", 40, 0.3),
+                                  endpoint_latency={"token": LatencyModel("lognormal", 300, 0.5)},
+                                  token_ttl=20, token_error_rate=0.5),
+}
+
+
+class FakeHTTPError(Exception):
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+class FakeSpotify:
+    # Spotify Web API'nin yerel taklidi. spotipy istemcisi ve transport'un HTTP oturumu
+    # gerçek haliyle kullanılır; istekler FakeSpotifyAdapter üzerinden buraya gelir.
+    def __init__(self, scenario, seed=None):
+        self.scenario = scenario
+        self.rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._requests = deque()
+        self._tokens = {}  # access token -> expires_at
+        self._tracks = {}
+        self._current = None
+        self._is_playing = False
+        self._position_ms = 0
+        self._started_at = 0.0
+
+    def sample_delay(self, endpoint):
+        with self._lock:
+            return self.scenario.latency_for(endpoint).sample(self.rng)
+
+    def issue_token(self):
+        with self._lock:
+            token = f"fake-token-{len(self._tokens)}"
+            expires_at = int(time.time()) + self.scenario.token_ttl
+            self._tokens[token] = expires_at
+            failed = self.rng.random() < self.scenario.token_error_rate
+        return token, expires_at, failed
+
+    def authorize(self, token):
+        expires_at = self._tokens.get(token)
+        if expires_at is None or expires_at <= time.time():
+            raise FakeHTTPError(401, "The access token expired")
+
+    def request(self, endpoint, read_timeout=None):
+        with self._lock:
+            now = time.monotonic()
+            if self.scenario.rate_limit:
+                limit, window = self.scenario.rate_limit
+                while self._requests and now - self._requests[0] > window:
+                    self._requests.popleft()
+                if len(self._requests) >= limit:
+                    raise FakeHTTPError(429, f"{endpoint}: API rate limit exceeded",
+                                        {"Retry-After": str(self.scenario.retry_after)})
+                self._requests.append(now)
+            delay = self.scenario.latency_for(endpoint).sample(self.rng)
+            failed = self.rng.random() < self.scenario.error_rate
+        if read_timeout is not None and delay > read_timeout:
+            # Gerçek istemci gibi okuma zaman aşımında vazgeç
+            time.sleep(read_timeout)
+            raise requests.exceptions.ReadTimeout(f"{endpoint}: read timed out ({read_timeout} sn)")
+        time.sleep(delay)
+        if failed:
+            raise FakeHTTPError(self.scenario.error_status, f"{endpoint}: injected failure")
+
+    def _track(self, title, artist):
+        for track in self._tracks.values():
+            if track['name'] == title and track['artists'][0]['name'] == artist:
+                return track
+        uri = f"spotify:track:fake{len(self._tracks)}"
+        self._tracks[uri] = {
+            'name': title,
+            'uri': uri,
+            'duration_ms': self.rng.randint(150, 330) * 1000,
+            'artists': [{'name': artist}],
+            'album': {'name': f"{artist} Album"},
+        }
+        return self._tracks[uri]
+
+    def _progress_ms(self):
+        if self._is_playing:
+            return self._position_ms + int((time.monotonic() - self._started_at) * 1000)
+        return self._position_ms
+
+    def search(self, q, limit=10, type='track'):
+        title, _, artist = q.partition(" artist:")
+        title = title.removeprefix("track:")
+        artist = artist or "Unknown Artist"
+        return {'tracks': {'items': [self._track(title, artist)][:int(limit)]}}
+
+    def devices(self):
+        if not self.scenario.devices:
+            return {'devices': []}
+        return {'devices': [{'id': "fake-device", 'name': "Fake Speaker", 'is_active': True}]}
+
+    def start_playback(self, device_id=None, uris=None):
+        if uris:
+            self._current = self._tracks.get(uris[0]) or self._track(uris[0], "Unknown Artist")
+            self._position_ms = 0
+        elif self._current is None:
+            raise FakeHTTPError(404, "start_playback: no active track")
+        else:
+            self._position_ms = self._progress_ms()
+        self._is_playing = True
+        self._started_at = time.monotonic()
+
+    def pause_playback(self, device_id=None):
+        self._position_ms = self._progress_ms()
+        self._is_playing = False
+
+    def current_playback(self):
+        if self._current is None:
+            return None
+        progress_ms = min(self._progress_ms(), self._current['duration_ms'])
+        return {
+            'is_playing': self._is_playing and progress_ms < self._current['duration_ms'],
+            'progress_ms': progress_ms,
+            'item': self._current,
+        }
+
+
+class FakeSpotifyAdapter(BaseAdapter):
+    # transport.session'a api.spotify.com için bağlanır: istekler gerçek oturum, timeout
+    # ve spotipy hata işleme yolundan geçer, sadece ağ yerine FakeSpotify cevaplar
+    ROUTES = {
+        ("GET", "search"): "search",
+        ("GET", "me/player/devices"): "devices",
+        ("PUT", "me/player/play"): "start_playback",
+        ("PUT", "me/player/pause"): "pause_playback",
+        ("GET", "me/player"): "current_playback",
+        ("GET", "me/player/currently-playing"): "current_playback",
+    }
+
+    def __init__(self, server):
+        super().__init__()
+        self.server = server
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        url = urlparse(request.url)
+        route = url.path.removeprefix("/v1/")
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        endpoint = self.ROUTES.get((request.method, route))
+        read_timeout = timeout[1] if isinstance(timeout, tuple) else timeout
+
+        try:
+            if endpoint is None:
+                raise FakeHTTPError(404, f"{request.method} {route}: not implemented by fake")
+            self.server.authorize((request.headers.get("Authorization") or "").removeprefix("Bearer "))
+            self.server.request(endpoint, read_timeout)
+            if endpoint == "start_playback":
+                payload = json.loads(request.body) if request.body else {}
+                result = self.server.start_playback(params.get("device_id"), payload.get("uris"))
+            elif endpoint == "search":
+                result = self.server.search(params.get("q", ""), params.get("limit", 10), params.get("type"))
+            else:
+                result = getattr(self.server, endpoint)()
+            return self._response(request, 200 if result is not None else 204, result)
+        except FakeHTTPError as e:
+            return self._response(request, e.status, {"error": {"status": e.status, "message": str(e)}},
+                                  e.headers)
+
+    def _response(self, request, status, body, headers=None):
+        response = requests.Response()
+        response.status_code = status
+        response.reason = "Fake"
+        response.headers = CaseInsensitiveDict(headers or {})
+        response._content = json.dumps(body).encode("utf-8") if body is not None else b""
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+class FakeOAuth:
+    # models/auth.TokenManager'ın kullandığı SpotifyOAuth yüzeyi; token alma ve yenileme
+    # senaryodaki "token" gecikmesi ve token_error_rate ile simüle edilir
+    def __init__(self, server):
+        self.server = server
+        self.cache_handler = MemoryCacheHandler()
+
+    def validate_token(self, token_info):
+        return token_info
+
+    def get_access_token(self, code=None, as_dict=True, check_cache=True):
+        token_info = self._issue("token")
+        return token_info if as_dict else token_info['access_token']
+
+    def refresh_access_token(self, refresh_token):
+        return self._issue("token_refresh")
+
+    def _issue(self, kind):
+        time.sleep(self.server.sample_delay("token"))
+        token, expires_at, failed = self.server.issue_token()
+        if failed:
+            raise SpotifyOauthError(f"{kind}: injected failure", error="server_error")
+        token_info = {
+            'access_token': token,
+            'refresh_token': "fake-refresh-token",
+            'expires_at': expires_at,
+            'expires_in': self.server.scenario.token_ttl,
+            'scope': "user-read-playback-state user-modify-playback-state",
+            'token_type': "Bearer",
+        }
+        self.cache_handler.save_token_to_cache(token_info)
+        return token_info
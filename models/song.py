@@ -1,10 +1,9 @@
-import pygame
 import os
-import spotipy
-from spotipy.oauth2 import SpotifyOAuth
+import time
 import webbrowser
-
-pygame.mixer.init()
+from config import *
+from models.clock import PlaybackClock
+from telemetry import events
 
 class Song:
     # Spotify API credentials
@@ -15,61 +14,160 @@ class Song:
     # Spotify API instance
     spotify = None
     
+    # Ortak HTTP oturumu, retry/backoff ve endpoint istatistikleri
+    transport = None
+    
+    # Token bellekte tutulur ve süresi dolmadan arka planda yenilenir
+    token_manager = None
+    
+    # Çalma işlemlerini yapan backend (Spotify veya yerel dosya)
+    backend = None
+    
     # Aktif şarkıyı takip etmek için statik değişken
     active_song = None
     
-    # Device ID önbelleği
-    _cached_device_id = None
-    _last_device_check = 0
+    # Sıradaki şarkıları önceden hazırlamak için yüklenen playlist
+    playlist = []
     
     @classmethod
     def initialize_spotify(cls, client_id, client_secret):
         cls.CLIENT_ID = client_id
         cls.CLIENT_SECRET = client_secret
         
+        if SPOTIFY_API == "fake":
+            cls.initialize_fake(FAKE_SPOTIFY_SCENARIO)
+            return
+        
+        # Ağır modüller sadece Spotify gerçekten başlatılırken yüklenir
+        import spotipy
+        from spotipy.oauth2 import SpotifyOAuth
+        from models.transport import SpotifyTransport
+        from models.auth import AtomicCacheFileHandler, TokenManager
+        
         # Spotify API'ye bağlan
-        cls.spotify = spotipy.Spotify(auth_manager=SpotifyOAuth(
+        cls.transport = SpotifyTransport()
+        cls.token_manager = TokenManager(SpotifyOAuth(
             client_id=cls.CLIENT_ID,
             client_secret=cls.CLIENT_SECRET,
             redirect_uri=cls.REDIRECT_URI,
-            scope="user-read-playback-state user-modify-playback-state"
+            scope="user-read-playback-state user-modify-playback-state",
+            cache_handler=AtomicCacheFileHandler(),
+            requests_session=cls.transport.session,
+            requests_timeout=SPOTIFY_REQUEST_TIMEOUT
         ))
+        cls.token_manager.start()
+        cls.transport.on_unauthorized = cls.token_manager.refresh_now
+        cls.spotify = spotipy.Spotify(auth_manager=cls.token_manager, **cls.transport.spotify_kwargs())
+        cls._start_spotify_backend()
+
+    @classmethod
+    def initialize_fake(cls, scenario_name, seed=None):
+        # Gerçek hesap olmadan test için gecikme/hata enjekte eden yerel Spotify taklidi.
+        # Sadece ağ taklit edilir: spotipy, transport oturumu/timeout'u ve TokenManager gerçektir.
+        import spotipy
+        from models.transport import SpotifyTransport
+        from models.auth import TokenManager
+        from models.fake_spotify import FakeOAuth, FakeSpotify, FakeSpotifyAdapter, SCENARIOS
         
-        # İlk device ID'yi önbelleğe al
-        try:
-            devices = cls.spotify.devices()
-            if devices['devices']:
-                cls._cached_device_id = devices['devices'][0]['id']
-                cls._last_device_check = pygame.time.get_ticks()
-        except Exception:
-            pass
-
-    def __init__(self, title, artist, duration, spotify_uri=None, album=None, progress=0):
+        scenario = SCENARIOS[scenario_name]
+        server = FakeSpotify(scenario, seed)
+        cls.transport = SpotifyTransport()
+        cls.transport.session.mount("https://api.spotify.com/", FakeSpotifyAdapter(server))
+        # Kısa ömürlü token senaryolarında yenileme de token ömrüne göre ölçeklenir
+        cls.token_manager = TokenManager(FakeOAuth(server),
+                                         refresh_margin=min(TOKEN_REFRESH_MARGIN, scenario.token_ttl / 4),
+                                         retry_interval=min(TOKEN_REFRESH_RETRY, scenario.token_ttl / 4))
+        cls.token_manager.start()
+        cls.transport.on_unauthorized = cls.token_manager.refresh_now
+        cls.spotify = spotipy.Spotify(auth_manager=cls.token_manager, **cls.transport.spotify_kwargs())
+        cls._start_spotify_backend()
+
+    @classmethod
+    def _start_spotify_backend(cls):
+        from models.backends import SpotifyBackend
+        
+        # Device ID önbelleğini arka planda yenile
+        cls.transport.start_device_refresh(cls.spotify)
+        cls.backend = SpotifyBackend(cls.spotify, cls.transport)
+
+    @classmethod
+    def shutdown(cls):
+        if cls.transport:
+            cls.transport.stop_device_refresh()
+        if cls.token_manager:
+            cls.token_manager.stop()
+        cls.spotify = None
+        cls.transport = None
+        cls.token_manager = None
+        cls.backend = None
+        cls.active_song = None
+
+    @classmethod
+    def initialize_local(cls, music_dir=LOCAL_MUSIC_DIR):
+        from models.backends import LocalFileBackend
+        
+        cls.backend = LocalFileBackend(music_dir)
+
+    def __init__(self, title, artist, duration, spotify_uri=None, album=None, progress=0, duration_ms=None,
+                 local_path=None):
         self.title = title
         self.artist = artist
         self.duration = duration
         self.album = album
+        self.duration_ms = duration_ms
+        # İlerleme her karede yerel saatten hesaplanır, poll sadece düzeltme yapar
+        self.clock = PlaybackClock(duration_ms)
+        self._progress = 0
         self.progress = progress
         self.spotify_uri = spotify_uri
+        self.local_path = local_path
         self.is_playing = False
+        self._command_time = None
+
+    @property
+    def progress(self):
+        if self.clock.duration_ms:
+            return self.clock.progress
+        return self._progress
+
+    @progress.setter
+    def progress(self, value):
+        self._progress = value
+        if self.clock.duration_ms:
+            self.clock.seek(value * self.clock.duration_ms)
+
+    def sync_playback(self, progress_ms, is_playing, duration_ms=None, sampled_at=None, uri=None):
+        if self._command_time is not None:
+            sample_time = time.monotonic() if sampled_at is None else sampled_at
+            if sample_time - self._command_time < PLAYBACK_COMMAND_GRACE:
+                # Spotify komuttan hemen sonra kısa bir süre önceki parçayı/durumu bildirir;
+                # bu örnek yeni çalan şarkıyı bitmiş ya da duraklamış gösterebilir
+                return
+        if uri is not None and uri not in (self.spotify_uri, self.local_path):
+            # Başka bir parça çalıyor (autoplay veya Spotify uygulamasından değişiklik):
+            # onun süresini bu şarkıya yazma, bu şarkıyı bitmiş say
+            self.is_playing = False
+            if self.clock.duration_ms:
+                self.clock.seek(self.clock.duration_ms)
+            self.clock.pause()
+            self._progress = self.clock.progress
+            return
+        self.is_playing = is_playing
+        if progress_ms is None:
+            self.clock.pause()
+            return
+        if duration_ms:
+            self.duration_ms = duration_ms
+        self.clock.sync(progress_ms, is_playing, duration_ms, sampled_at)
+        if self.clock.duration_ms:
+            self._progress = self.clock.progress
 
     def play(self):
-        if not self.spotify_uri or not self.__class__.spotify:
+        backend = self.__class__.backend
+        if not backend or not backend.can_play(self):
             return False
 
         try:
-            current_time = pygame.time.get_ticks()
-            
-            # Device ID'yi sadece 30 saniyede bir kontrol et
-            if (not self.__class__._cached_device_id or 
-                current_time - self.__class__._last_device_check > 30000):
-                devices = self.__class__.spotify.devices()
-                if devices['devices']:
-                    self.__class__._cached_device_id = devices['devices'][0]['id']
-                    self.__class__._last_device_check = current_time
-                else:
-                    return False
-            
             # Geçici olarak önceki aktif şarkıyı sakla
             previous_song = self.__class__.active_song
             
@@ -78,73 +176,105 @@ class Song:
             self.is_playing = True
             
             # Sonra şarkıyı çal
-            self.__class__.spotify.start_playback(
-                device_id=self.__class__._cached_device_id, 
-                uris=[self.spotify_uri]
-            )
+            if not backend.play(self):
+                self.is_playing = False
+                self.__class__.active_song = previous_song
+                events.emit(events.PLAYBACK, self.title, "play", False)
+                return False
+            
+            self.clock.start(0)
+            self._command_time = time.monotonic()
+            events.emit(events.PLAYBACK, self.title, "play", True)
             
             # En son önceki şarkıyı temizle
             if previous_song and previous_song != self:
                 previous_song.is_playing = False
+                previous_song.clock.reset()
                 previous_song.progress = 0
             
+            # Sıradaki şarkıların başlangıçlarını önceden hazırla
+            backend.prefetch(self._next_songs())
             return True
             
         except Exception as e:
             self.is_playing = False
+            self.clock.reset()
             self.__class__.active_song = None
+            events.emit(events.PLAYBACK, self.title, "play", False)
             if "Restriction violated" in str(e):
-                print("Spotify Premium gerekiyor veya başka bir cihazda çalıyor olabilir.")
+                events.error("play", "Spotify Premium gerekiyor veya başka bir cihazda çalıyor olabilir.")
             else:
-                print(f"Spotify playback error: {e}")
+                events.error("play", f"Playback error: {e}")
             return False
 
     def stop(self):
-        if self.spotify_uri and self.__class__.spotify:
+        backend = self.__class__.backend
+        if backend and backend.can_play(self):
             try:
-                self.__class__.spotify.pause_playback()
+                backend.stop(self)
+                events.emit(events.PLAYBACK, self.title, "stop", True)
+                self._command_time = time.monotonic()
                 self.is_playing = False
+                self.clock.reset()
                 self.progress = 0
                 if self.__class__.active_song == self:
                     self.__class__.active_song = None
                 return True
             except Exception as e:
+                events.emit(events.PLAYBACK, self.title, "stop", False)
                 if "Restriction violated" in str(e):
-                    print("Spotify Premium gerekiyor veya başka bir cihazda çalıyor olabilir.")
+                    events.error("playback", "Spotify Premium gerekiyor veya başka bir cihazda çalıyor olabilir.")
                 return False
         return False
 
     def pause(self):
-        if self.spotify_uri and self.__class__.spotify:
+        backend = self.__class__.backend
+        if backend and backend.can_play(self):
             try:
-                self.__class__.spotify.pause_playback()
+                backend.pause(self)
+                events.emit(events.PLAYBACK, self.title, "pause", True)
+                self._command_time = time.monotonic()
                 self.is_playing = False
+                self.clock.pause()
                 if self.__class__.active_song == self:
                     self.__class__.active_song = None
                 return True
             except Exception as e:
+                events.emit(events.PLAYBACK, self.title, "pause", False)
                 if "Restriction violated" in str(e):
-                    print("Spotify Premium gerekiyor veya başka bir cihazda çalıyor olabilir.")
+                    events.error("playback", "Spotify Premium gerekiyor veya başka bir cihazda çalıyor olabilir.")
                 return False
         return False
 
     def unpause(self):
-        if self.spotify_uri and self.__class__.spotify:
+        backend = self.__class__.backend
+        if backend and backend.can_play(self):
             try:
-                self.__class__.spotify.start_playback()
+                backend.unpause(self)
+                events.emit(events.PLAYBACK, self.title, "resume", True)
+                self._command_time = time.monotonic()
                 self.is_playing = True
+                self.clock.resume()
                 self.__class__.active_song = self
                 return True
             except Exception as e:
+                events.emit(events.PLAYBACK, self.title, "resume", False)
                 if "Restriction violated" in str(e):
-                    print("Spotify Premium gerekiyor veya başka bir cihazda çalıyor olabilir.")
+                    events.error("playback", "Spotify Premium gerekiyor veya başka bir cihazda çalıyor olabilir.")
                 return False
         return False
 
+    def _next_songs(self):
+        playlist = self.__class__.playlist
+        if self not in playlist:
+            return playlist[:LOCAL_PREFETCH_COUNT]
+        index = playlist.index(self)
+        return [playlist[(index + i) % len(playlist)] for i in range(1, LOCAL_PREFETCH_COUNT + 1)]
+
     @staticmethod
     def search_songs(query, limit=10):
         if Song.spotify:
-            results = Song.spotify.search(q=query, limit=limit, type='track')
+            results = Song.transport.call("search", Song.spotify.search, q=query, limit=limit, type='track')
             songs = []
             for track in results['tracks']['items']:
                 song = Song(
@@ -152,16 +282,29 @@ class Song:
                     artist=track['artists'][0]['name'],
                     duration=str(int(track['duration_ms']/1000//60)) + ":" + str(int(track['duration_ms']/1000%60)).zfill(2),
                     spotify_uri=track['uri'],
-                    album=track['album']['name']
+                    album=track['album']['name'],
+                    duration_ms=track['duration_ms']
                 )
                 songs.append(song)
             return songs
         return []
 
+    @staticmethod
+    def current_playback():
+        if Song.backend:
+            return Song.backend.current_playback()
+        return None
+
+    @staticmethod
+    def get_transport_stats():
+        if Song.transport:
+            return Song.transport.get_stats()
+        return {}
+
     @staticmethod
     def get_current_song():
         if Song.spotify:
-            current = Song.spotify.current_user_playing_track()
+            current = Song.transport.call("currently_playing", Song.spotify.current_user_playing_track)
             if current and current['item']:
                 track = current['item']
                 return Song(
@@ -170,7 +313,8 @@ class Song:
                     str(int(track['duration_ms']/1000//60)) + ":" + str(int(track['duration_ms']/1000%60)).zfill(2),
                     track['uri'],
                     track['album']['name'],
-                    current['progress_ms'] / track['duration_ms']
+                    current['progress_ms'] / track['duration_ms'],
+                    track['duration_ms']
                 )
         return None
 
@@ -189,7 +333,8 @@ class Song:
             for song_data in playlist_data:
                 # Her şarkı için arama yap
                 query = f"track:{song_data['title']} artist:{song_data['artist']}"
-                results = Song.spotify.search(q=query, limit=1, type='track')
+                results = Song.transport.call("search", Song.spotify.search, q=query, limit=1, type='track',
+                                              background=True)
                 
                 if results['tracks']['items']:
                     track = results['tracks']['items'][0]
@@ -198,7 +343,8 @@ class Song:
                         artist=song_data['artist'],
                         duration=str(int(track['duration_ms']/1000//60)) + ":" + str(int(track['duration_ms']/1000%60)).zfill(2),
                         spotify_uri=track['uri'],
-                        album=song_data['album']
+                        album=song_data['album'],
+                        duration_ms=track['duration_ms']
                     )
                     playlist_songs.append(song)
                 else:
@@ -212,5 +358,24 @@ class Song:
                     )
                     playlist_songs.append(song)
                     print(f"Şarkı bulunamadı: {song_data['title']} - {song_data['artist']}")
+        elif Song.backend:
+            # Yerel backend: dosyalar "<sanatçı> - <şarkı>.<uzantı>" adıyla aranır
+            for song_data in playlist_data:
+                path = Song.backend.find_file(song_data['title'], song_data['artist'])
+                duration_ms = Song.backend.duration_ms(path) if path else None
+                song = Song(
+                    title=song_data['title'],
+                    artist=song_data['artist'],
+                    duration=str(int(duration_ms/1000//60)) + ":" + str(int(duration_ms/1000%60)).zfill(2) if duration_ms else "0:00",
+                    album=song_data['album'],
+                    duration_ms=duration_ms,
+                    local_path=path
+                )
+                playlist_songs.append(song)
+                if not path:
+                    print(f"Şarkı dosyası bulunamadı: {song_data['artist']} - {song_data['title']}")
         
+        Song.playlist = playlist_songs
+        if Song.backend:
+            Song.backend.prefetch(playlist_songs[:LOCAL_PREFETCH_COUNT])
         return playlist_songs 
\ No newline at end of file
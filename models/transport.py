@@ -0,0 +1,231 @@
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from spotipy.exceptions import SpotifyException
+from config import *
+from telemetry import events
+
+
+class SpotifyRateLimited(Exception):
+    def __init__(self, retry_after):
+        super().__init__(f"Spotify rate limit aktif, {retry_after:.1f} sn sonra tekrar denenecek")
+        self.retry_after = retry_after
+
+
+class CallTimeoutSession(requests.Session):
+    # spotipy her isteğe Spotify nesnesinin sabit timeout'unu verir; çağrı başına
+    # farklı timeout için o thread'de çalışan çağrının timeout'u burada uygulanır
+    def __init__(self):
+        super().__init__()
+        self._local = threading.local()
+
+    def request(self, method, url, **kwargs):
+        timeout = getattr(self._local, "timeout", None)
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        return super().request(method, url, **kwargs)
+
+    def set_call_timeout(self, timeout):
+        self._local.timeout = timeout
+
+
+class EndpointStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.last_latency = 0.0
+
+    def to_dict(self):
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "avg_latency_ms": self.total_latency / self.calls * 1000 if self.calls else 0.0,
+            "max_latency_ms": self.max_latency * 1000,
+            "last_latency_ms": self.last_latency * 1000,
+        }
+
+
+class SpotifyTransport:
+    def __init__(self, pool_size=SPOTIFY_POOL_SIZE, timeout=SPOTIFY_REQUEST_TIMEOUT,
+                 foreground_timeout=SPOTIFY_FOREGROUND_TIMEOUT, max_retries=SPOTIFY_MAX_RETRIES,
+                 backoff_base=SPOTIFY_BACKOFF_BASE, backoff_max=SPOTIFY_BACKOFF_MAX,
+                 max_rate_limit_wait=SPOTIFY_MAX_RATE_LIMIT_WAIT):
+        self.timeout = timeout
+        self.foreground_timeout = foreground_timeout
+        self.max_retries = max_retries
+        self.max_rate_limit_wait = max_rate_limit_wait
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        # Keep-alive bağlantı havuzu; tekrar denemeyi biz yönettiğimiz için adapter denemesin
+        self.session = CallTimeoutSession()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._lock = threading.Lock()
+        self._blocked_until = 0.0
+        self._rate_limited = False
+        self._stats = {}
+
+        # 401 alındığında çağrılır (TokenManager.refresh_now); token beklemeden yenilenir
+        self.on_unauthorized = None
+
+        self._device_id = None
+        self._device_thread = None
+        self._device_stop = threading.Event()
+
+    def spotify_kwargs(self):
+        # spotipy.Spotify'a verilecek ayarlar: ortak oturum, sıkı timeout, dahili retry kapalı
+        return {
+            "requests_session": self.session,
+            "requests_timeout": self.timeout,
+            "retries": 0,
+            "status_retries": 0,
+        }
+
+    def call(self, endpoint, func, *args, background=False, **kwargs):
+        # Ana döngüden gelen çağrılar (varsayılan) tek deneme ve kısa timeout ile çalışır,
+        # rate limit aktifse beklemeden SpotifyRateLimited alır. Sadece arka plan çağrıları
+        # (background=True) rate limit'i bir süre bekler, uzun timeout ile tekrar dener.
+        if background:
+            max_wait, max_retries, timeout = self.max_rate_limit_wait, self.max_retries, self.timeout
+        else:
+            max_wait, max_retries, timeout = 0.0, 0, self.foreground_timeout
+        self.session.set_call_timeout(timeout)
+        try:
+            return self._call(endpoint, func, args, kwargs, max_wait, max_retries)
+        finally:
+            self.session.set_call_timeout(None)
+
+    def _call(self, endpoint, func, args, kwargs, max_wait, max_retries):
+        attempt = 0
+        while True:
+            self._wait_for_rate_limit(endpoint, attempt, max_wait)
+            events.emit(events.COMMAND_START, endpoint, attempt)
+            start = time.monotonic()
+            try:
+                result = func(*args, **kwargs)
+                latency = time.monotonic() - start
+                self._record(endpoint, latency)
+                events.emit(events.COMMAND_FINISH, endpoint, attempt, True, 200, latency * 1000)
+                if self._rate_limited:
+                    self._rate_limited = False
+                    events.emit(events.QUALITY, "spotify", "ok", endpoint)
+                return result
+            except SpotifyException as e:
+                latency = time.monotonic() - start
+                self._record(endpoint, latency, error=True)
+                events.emit(events.COMMAND_FINISH, endpoint, attempt, False, e.http_status or 0, latency * 1000)
+                if e.http_status == 429:
+                    retry_after = self._set_retry_after(endpoint, e.headers)
+                    if retry_after > max_wait:
+                        # Geri çekilme beklemesi de yapılmaz, hemen hata ver
+                        raise SpotifyRateLimited(retry_after)
+                elif e.http_status == 401:
+                    if self.on_unauthorized:
+                        self.on_unauthorized()
+                    raise
+                elif not (e.http_status and e.http_status >= 500):
+                    raise
+                if attempt >= max_retries:
+                    raise
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                latency = time.monotonic() - start
+                self._record(endpoint, latency, error=True)
+                events.emit(events.COMMAND_FINISH, endpoint, attempt, False, 0, latency * 1000)
+                if attempt >= max_retries:
+                    raise
+            attempt += 1
+            with self._lock:
+                self._stats_for(endpoint).retries += 1
+            time.sleep(self._backoff(attempt))
+
+    def get_stats(self):
+        with self._lock:
+            return {endpoint: stats.to_dict() for endpoint, stats in self._stats.items()}
+
+    def _backoff(self, attempt):
+        # Full jitter üstel geri çekilme
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _wait_for_rate_limit(self, endpoint, attempt=0, max_wait=0.0):
+        with self._lock:
+            remaining = self._blocked_until - time.monotonic()
+        if remaining <= 0:
+            return
+        if remaining > max_wait:
+            # Çağıranı bekletme, hatayı kendisi işlesin
+            with self._lock:
+                self._stats_for(endpoint).rate_limited += 1
+            events.emit(events.COMMAND_REJECTED, endpoint, attempt, remaining * 1000)
+            raise SpotifyRateLimited(remaining)
+        time.sleep(remaining)
+
+    def _set_retry_after(self, endpoint, headers):
+        try:
+            retry_after = float((headers or {}).get("Retry-After", 1))
+        except (TypeError, ValueError):
+            retry_after = 1.0
+        with self._lock:
+            self._stats_for(endpoint).rate_limited += 1
+            self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+        if not self._rate_limited:
+            self._rate_limited = True
+            events.emit(events.QUALITY, "spotify", "rate_limited", f"{endpoint}: Retry-After {retry_after:.1f} sn")
+        return retry_after
+
+    def _record(self, endpoint, latency, error=False):
+        with self._lock:
+            stats = self._stats_for(endpoint)
+            stats.calls += 1
+            stats.total_latency += latency
+            stats.last_latency = latency
+            stats.max_latency = max(stats.max_latency, latency)
+            if error:
+                stats.errors += 1
+
+    def _stats_for(self, endpoint):
+        if endpoint not in self._stats:
+            self._stats[endpoint] = EndpointStats()
+        return self._stats[endpoint]
+
+    # Device önbelleği arka planda yenilenir, play() içinde ağ beklemesi olmaz
+    @property
+    def device_id(self):
+        return self._device_id
+
+    def refresh_devices(self, spotify, background=False):
+        devices = self.call("devices", spotify.devices, background=background)
+        if devices and devices['devices']:
+            self._device_id = devices['devices'][0]['id']
+        else:
+            self._device_id = None
+        return self._device_id
+
+    def start_device_refresh(self, spotify, interval=DEVICE_REFRESH_INTERVAL):
+        self.stop_device_refresh()
+        self._device_stop = threading.Event()
+
+        def refresh_loop(stop):
+            while not stop.is_set():
+                try:
+                    self.refresh_devices(spotify, background=True)
+                except Exception:
+                    pass
+                stop.wait(interval)
+
+        self._device_thread = threading.Thread(target=refresh_loop, args=(self._device_stop,), daemon=True)
+        self._device_thread.start()
+
+    def stop_device_refresh(self):
+        self._device_stop.set()
+        self._device_thread = None
@@ -0,0 +1,79 @@
+import threading
+from collections import deque
+from config import *
+from gesture.detector import create_models, detect
+from telemetry import events
+
+
+class InferencePool:
+    # Tüm oturumlar için ortak MediaPipe worker'ları.
+    # Her oturumun en fazla bir karesi bekler (yenisi eskisinin yerine geçer) ve en fazla
+    # bir karesi işlenir; sıradaki iş round-robin seçildiği için yoğun bir oturum
+    # diğerlerini bekletemez.
+    def __init__(self, num_workers=INFERENCE_WORKERS, static_image_mode=INFERENCE_STATIC_IMAGE_MODE):
+        self._cond = threading.Condition()
+        self._pending = {}
+        self._order = deque()
+        self._in_flight = set()
+        self._closed = False
+        self.processed = {}
+        self.dropped = {}
+
+        self._workers = []
+        for i in range(num_workers):
+            worker = threading.Thread(target=self._worker_loop, args=(static_image_mode,),
+                                      name=f"inference-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def submit(self, session_id, frame, callback):
+        with self._cond:
+            if session_id in self._pending:
+                self.dropped[session_id] = self.dropped.get(session_id, 0) + 1
+                events.emit(events.FRAME_DROP, session_id, "inference", 0.0)
+            else:
+                self._order.append(session_id)
+            self._pending[session_id] = (frame, callback)
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def _next_job(self):
+        for _ in range(len(self._order)):
+            session_id = self._order.popleft()
+            if session_id in self._in_flight:
+                self._order.append(session_id)
+                continue
+            frame, callback = self._pending.pop(session_id)
+            self._in_flight.add(session_id)
+            return session_id, frame, callback
+        return None
+
+    def _worker_loop(self, static_image_mode):
+        # Her worker kendi grafiklerini kullanır; MediaPipe grafikleri thread-safe değil
+        hands, face_detection = create_models(static_image_mode)
+        if OUTPUT_REGION == "ui":
+            # Kamera görüntüsü gösterilmiyor; yüz tespiti sadece bulanıklık için gerekir
+            face_detection = None
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None and not self._closed:
+                    self._cond.wait()
+                    job = self._next_job()
+                if self._closed:
+                    return
+            session_id, frame, callback = job
+            try:
+                hand_results, face_results = detect(hands, face_detection, frame)
+                callback(frame, hand_results, face_results)
+            except Exception as e:
+                events.error(f"inference{session_id}", e)
+            finally:
+                with self._cond:
+                    self._in_flight.discard(session_id)
+                    self.processed[session_id] = self.processed.get(session_id, 0) + 1
+                    self._cond.notify_all()
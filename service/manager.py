@@ -0,0 +1,124 @@
+import queue
+import threading
+import time
+from config import *
+from main import handle_interactions, load_playlist, update_playback_state
+from models.song import Song
+from service.inference import InferencePool
+from service.session import KioskSession
+from telemetry import events
+
+
+class PlaylistStore:
+    # Bütün oturumlar aynı Song nesnelerini, aynı Spotify bağlantısını ve aynı çalan şarkıyı
+    # paylaşır (tek oynatıcı: bir kiosktaki tıklama hepsinde çalanı değiştirir).
+    # Song üzerindeki her işlem (tıklamalar ve durum sorgusu) tek bir komut thread'inde
+    # sırayla yapılır; oturumlar sadece kuyruğa ekler ve Spotify'ı hiç beklemez.
+    def __init__(self, max_pending=SESSION_COMMAND_QUEUE_SIZE):
+        self.songs = []
+        self.current_song = None
+        self._commands = queue.Queue(maxsize=max_pending)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def load_async(self, client_id, client_secret):
+        self._thread = threading.Thread(target=self._run, args=(client_id, client_secret),
+                                        name="playlist-store", daemon=True)
+        self._thread.start()
+
+    def submit_click(self, session_id, pinch_x, pinch_y, menu_items, vertical_scroll_pos):
+        # Kuyruk doluysa tıklama atlanır; oturum bir sonraki karede tekrar dener
+        try:
+            self._commands.put_nowait((session_id, pinch_x, pinch_y, menu_items, vertical_scroll_pos))
+            return True
+        except queue.Full:
+            return False
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+
+    def _run(self, client_id, client_secret):
+        try:
+            self.songs = load_playlist(client_id, client_secret)
+        except Exception as e:
+            events.error("playlist", f"Playlist yüklenemedi: {e}")
+
+        # Çalma durumu oturum sayısından bağımsız olarak burada tek kez sorgulanır
+        last_check = 0
+        while not self._stop.is_set():
+            try:
+                session_id, pinch_x, pinch_y, menu_items, vertical_scroll_pos = self._commands.get(timeout=0.1)
+                _, self.current_song = handle_interactions(pinch_x, pinch_y, menu_items, self.songs,
+                                                           vertical_scroll_pos, self.current_song, session_id)
+            except queue.Empty:
+                pass
+            last_check = update_playback_state(self.current_song, last_check)
+
+
+class SessionManager:
+    def __init__(self, session_configs=SESSIONS, num_workers=INFERENCE_WORKERS):
+        # Kameralar açılırken üretilen olaylar (ör. çözünürlük düşüşü) kaybolmasın diye bus önce başlar
+        if TELEMETRY_ENABLED:
+            events.start()
+        self.pool = InferencePool(num_workers)
+        self.playlist_store = PlaylistStore()
+        self.sessions = []
+        for i, session_config in enumerate(session_configs):
+            self.sessions.append(KioskSession(
+                session_id=i,
+                camera_index=session_config.get("camera", i),
+                sink_kind=session_config.get("sink", OUTPUT_SINK),
+                sink_target=session_config.get("target"),
+                pool=self.pool,
+                playlist_store=self.playlist_store,
+            ))
+
+    def run(self, client_id=None, client_secret=None):
+        self.playlist_store.load_async(client_id, client_secret)
+
+        # HighGUI pencereleri ana thread'de, diğer çıktılar kendi thread'lerinde çalışır
+        window_sessions = [session for session in self.sessions if session.is_window]
+        threads = []
+        for session in self.sessions:
+            if not session.is_window:
+                thread = threading.Thread(target=session.run, name=f"session-{session.session_id}", daemon=True)
+                thread.start()
+                threads.append(thread)
+
+        try:
+            while any(session.running for session in self.sessions):
+                progressed = False
+                for session in window_sessions:
+                    if not session.running:
+                        continue
+                    progressed = session.step() or progressed
+                    key = session.sink.poll_key()
+                    if key == ord("q"):
+                        return
+                    elif key == ord("f"):
+                        session.sink.toggle_fullscreen()
+                if not progressed:
+                    time.sleep(0.005)
+        except KeyboardInterrupt:
+            print("\nUygulama kapatılıyor...")
+        finally:
+            for session in self.sessions:
+                session.running = False
+            for thread in threads:
+                thread.join(timeout=1.0)
+            for session in self.sessions:
+                session.close()
+            self.pool.close()
+            self.playlist_store.stop()
+            Song.shutdown()
+            events.stop()
+            self.report()
+
+    def report(self):
+        print("Oturum istatistikleri:")
+        for session in self.sessions:
+            session_id = session.session_id
+            print(f"  oturum {session_id}: işlenen kare={self.pool.processed.get(session_id, 0)}"
+                  f" atlanan kare={self.pool.dropped.get(session_id, 0)}")
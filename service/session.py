@@ -0,0 +1,153 @@
+import threading
+import time
+import cv2
+from config import *
+from telemetry import events
+from gesture.detector import GestureDetector
+from main import open_camera, get_owner_controls, update_scroll_positions
+from ui.renderer import UIRenderer
+from ui.sinks import create_sink
+
+
+class CameraReader:
+    # Kameradan sürekli okur, her zaman sadece en son kare saklanır
+    def __init__(self, camera_index):
+        self.cap, self.width, self.height = open_camera(camera_index)
+        self._cond = threading.Condition()
+        self._frame = None
+        self._frame_id = 0
+        self.running = True
+        self._thread = threading.Thread(target=self._read_loop, daemon=True)
+        self._thread.start()
+
+    def _read_loop(self):
+        while self.running:
+            ret, frame = self.cap.read()
+            if not ret:
+                self.running = False
+                break
+            frame = cv2.flip(frame, 1)
+            with self._cond:
+                self._frame = frame
+                self._frame_id += 1
+                self._cond.notify_all()
+        with self._cond:
+            self._cond.notify_all()
+
+    def latest(self, after_id=0, timeout=0.0):
+        with self._cond:
+            if self._frame_id <= after_id and self.running and timeout:
+                self._cond.wait(timeout)
+            return self._frame_id, self._frame
+
+    def release(self):
+        self.running = False
+        self._thread.join(timeout=1.0)
+        self.cap.release()
+
+
+class KioskSession:
+    # Bir kamera + bir ekran; el, imleç, scroll ve çalan şarkı durumu oturuma özeldir
+    def __init__(self, session_id, camera_index, sink_kind, sink_target, pool, playlist_store):
+        self.session_id = session_id
+        self.pool = pool
+        self.playlist_store = playlist_store
+        self.camera = CameraReader(camera_index)
+        self.detector = GestureDetector(load_models=False, session_id=session_id)
+        self.renderer = UIRenderer(CAMERA_WIDTH, CAMERA_HEIGHT)
+
+        halves = 2 if OUTPUT_REGION == "both" else 1
+        # Sadece arayüz yayınlanıyorsa kamera yarısı (bulanıklık, el çizimi) hiç hesaplanmaz
+        self.show_camera = OUTPUT_REGION != "ui"
+        self.sink = create_sink(sink_kind, window_size=(self.camera.width * halves, self.camera.height),
+                                target=sink_target)
+        self.sink.open(*self.renderer.canvas_size(OUTPUT_REGION))
+        self.is_window = sink_kind == "window"
+
+        self.vertical_scroll_pos = 0
+        self.prev_cursor_y = -1
+        self.prev_owner_id = None
+        self.last_command_time = 0.0
+
+        self.running = True
+        self._frame_id = 0
+        self._result_lock = threading.Lock()
+        self._result = None
+        self._result_id = 0
+        self._shown_result_id = 0
+
+    def _on_result(self, frame, hand_results, face_results):
+        # Worker thread'inden çağrılır; sadece en son sonucu sakla
+        with self._result_lock:
+            self._result = (frame, hand_results, face_results)
+            self._result_id += 1
+
+    def step(self, timeout=0.0):
+        # Yeni kare varsa çıkarım için havuza gönder, en son çıkarım sonucunu çiz
+        frame_id, frame = self.camera.latest(self._frame_id, timeout)
+        if not self.camera.running:
+            self.running = False
+            return False
+        if frame_id != self._frame_id:
+            self._frame_id = frame_id
+            self.pool.submit(self.session_id, frame, self._on_result)
+
+        with self._result_lock:
+            result, result_id = self._result, self._result_id
+        if result is None or result_id == self._shown_result_id:
+            return False
+        self._shown_result_id = result_id
+        frame_start = time.monotonic()
+
+        frame, hand_results, face_results = result
+        if self.show_camera:
+            processed_frame = self.detector.apply_privacy_blur(frame, hand_results, face_results)
+        else:
+            processed_frame = frame
+        hands = self.detector.update_hands(hand_results, self.camera.width, self.camera.height)
+        if hands and self.show_camera:
+            self.detector.draw_hands(processed_frame, hands)
+
+        owner = self.detector.get_cursor_owner()
+        owner_id = owner.hand_id if owner else None
+        if owner_id != self.prev_owner_id:
+            # İmleç başka bir ele geçtiyse scroll farkını sıfırla
+            self.prev_cursor_y = -1
+            self.prev_owner_id = owner_id
+
+        cursor_x, cursor_y, pinch_x, pinch_y, scroll_gesture_active = get_owner_controls(
+            owner, self.camera.width, self.camera.height)
+
+        # Çalan şarkı bütün oturumlarda ortaktır
+        canvas = self.renderer.draw_modern_ui(processed_frame, cursor_x, cursor_y, self.vertical_scroll_pos,
+                                              self.playlist_store.current_song, self.playlist_store.songs,
+                                              pinch_x is not None,
+                                              region=OUTPUT_REGION, out=self.sink.acquire())
+
+        if cursor_x != -1 and cursor_y != -1 and scroll_gesture_active:
+            self.vertical_scroll_pos = update_scroll_positions(cursor_y, self.prev_cursor_y,
+                                                               scroll_gesture_active, self.vertical_scroll_pos)
+
+        # Ortak komut kuyruğunu tek bir oturumun doldurmaması için tıklamalar seyreltilir
+        now = time.monotonic()
+        if pinch_x is not None and pinch_y is not None and now - self.last_command_time >= SESSION_COMMAND_INTERVAL:
+            if self.playlist_store.submit_click(self.session_id, pinch_x, pinch_y, self.renderer.menu_items,
+                                                self.vertical_scroll_pos):
+                self.last_command_time = now
+
+        self.prev_cursor_y = cursor_y
+        self.sink.write(canvas)
+        frame_ms = (time.monotonic() - frame_start) * 1000
+        if frame_ms > TELEMETRY_SLOW_FRAME_MS:
+            events.emit(events.FRAME_DROP, self.session_id, "render", frame_ms)
+        return True
+
+    def run(self):
+        # Pencere dışı çıktılar kendi thread'lerinde çalışır
+        while self.running:
+            self.step(timeout=0.1)
+
+    def close(self):
+        self.running = False
+        self.camera.release()
+        self.sink.close()
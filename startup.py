@@ -0,0 +1,61 @@
+import threading
+import time
+from concurrent.futures import Future
+
+
+class StartupOrchestrator:
+    # Her adım kendi daemon thread'inde çalışır: ThreadPoolExecutor thread'leri çıkışta
+    # beklendiği için, hiç dönmeyen bir adım (ör. ilk çalıştırmadaki OAuth girişi)
+    # pencere kapandıktan sonra süreci açık tutardı
+    def __init__(self):
+        self._futures = {}
+        self._start = time.perf_counter()
+        self.timings = {}  # Her adımın kendi süresi
+        self.milestones = {}  # Başlangıçtan itibaren geçen süre
+        self._reported = False
+
+    def submit(self, name, func, *args, **kwargs):
+        future = Future()
+
+        def timed():
+            if not future.set_running_or_notify_cancel():
+                return
+            step_start = time.perf_counter()
+            try:
+                future.set_result(func(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                self.timings[name] = time.perf_counter() - step_start
+                self.milestones[name] = time.perf_counter() - self._start
+
+        self._futures[name] = future
+        threading.Thread(target=timed, name=f"startup-{name}", daemon=True).start()
+
+    def ready(self, name):
+        return self._futures[name].done()
+
+    def result(self, name, timeout=None):
+        return self._futures[name].result(timeout)
+
+    def all_ready(self):
+        return all(future.done() for future in self._futures.values())
+
+    def mark(self, name):
+        if name not in self.milestones:
+            self.milestones[name] = time.perf_counter() - self._start
+
+    def shutdown(self):
+        # Bitmemiş adımlar beklenmez; daemon thread'ler süreçle birlikte sonlanır
+        for future in self._futures.values():
+            future.cancel()
+
+    def report(self):
+        if self._reported:
+            return
+        self._reported = True
+        print("Başlangıç süreleri:")
+        for name, duration in sorted(self.timings.items(), key=lambda item: item[1], reverse=True):
+            print(f"  {name:<12} {duration * 1000:8.1f} ms")
+        for name, elapsed in sorted(self.milestones.items(), key=lambda item: item[1]):
+            print(f"  +{elapsed * 1000:8.1f} ms  {name}")
@@ -0,0 +1,149 @@
+import itertools
+import threading
+import time
+from config import *
+
+
+class EventType:
+    # fields: (isim, tür) çiftleri; tür "i" tam sayı, "f" ondalık, "b" bool, "s" metin
+    def __init__(self, code, name, fields):
+        self.code = code
+        self.name = name
+        self.fields = fields
+        self.field_names = tuple(field for field, _ in fields)
+
+
+GESTURE = EventType(1, "gesture", (("session", "i"), ("hand_id", "i"), ("gesture", "s"), ("active", "b")))
+CLICK = EventType(2, "click", (("session", "i"), ("x", "i"), ("y", "i"), ("target", "s"), ("song", "s"),
+                               ("action", "s")))
+COMMAND_START = EventType(3, "command_start", (("endpoint", "s"), ("attempt", "i")))
+COMMAND_FINISH = EventType(4, "command_finish", (("endpoint", "s"), ("attempt", "i"), ("ok", "b"),
+                                                 ("status", "i"), ("latency_ms", "f")))
+PLAYBACK = EventType(5, "playback", (("song", "s"), ("action", "s"), ("ok", "b")))
+FRAME_DROP = EventType(6, "frame_drop", (("session", "i"), ("source", "s"), ("elapsed_ms", "f")))
+QUALITY = EventType(7, "quality", (("component", "s"), ("level", "s"), ("detail", "s")))
+ERROR = EventType(8, "error", (("source", "s"), ("message", "s")))
+EVENTS_LOST = EventType(9, "events_lost", (("count", "i"),))
+# Rate limit nedeniyle hiç gönderilmeden reddedilen komut (gecikme istatistiğine girmez)
+COMMAND_REJECTED = EventType(10, "command_rejected", (("endpoint", "s"), ("attempt", "i"),
+                                                      ("retry_after_ms", "f")))
+
+EVENT_TYPES = {event_type.code: event_type for event_type in
+               (GESTURE, CLICK, COMMAND_START, COMMAND_FINISH, PLAYBACK, FRAME_DROP, QUALITY, ERROR, EVENTS_LOST,
+                COMMAND_REJECTED)}
+
+
+class RingBuffer:
+    # Çok yazarlı, tek okuyuculu halka buffer. Yazarlar kilit almaz: sıra numarası
+    # itertools.count ile atomik olarak alınır ve yuvaya (seq, kayıt) olarak yazılır.
+    # Okuyucu geride kalırsa eski kayıtların üzerine yazılır ve kayıp sayılır.
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._slots = [None] * capacity
+        self._claim = itertools.count()
+        self._read = 0
+        self.lost = 0
+
+    def push(self, record):
+        seq = next(self._claim)
+        self._slots[seq % self.capacity] = (seq, record)
+
+    def drain(self, limit):
+        records = []
+        while len(records) < limit:
+            slot = self._slots[self._read % self.capacity]
+            if slot is None or slot[0] < self._read:
+                # Yuva henüz yazılmadı
+                break
+            seq, record = slot
+            if seq > self._read:
+                # Yazarlar bir tur öne geçti; en eski geçerli kayda atla
+                oldest = seq - self.capacity + 1
+                self.lost += oldest - self._read
+                self._read = oldest
+                continue
+            records.append(record)
+            self._read += 1
+        return records
+
+
+class EventBus:
+    # Kayıtlar ana döngüde sadece buffer'a eklenir; dosyaya yazma arka plan thread'indedir
+    def __init__(self, writer, capacity=TELEMETRY_BUFFER_SIZE, flush_interval=TELEMETRY_FLUSH_INTERVAL,
+                 batch_size=TELEMETRY_BATCH_SIZE, echo_errors=TELEMETRY_ECHO_ERRORS):
+        self.writer = writer
+        self.ring = RingBuffer(capacity)
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.echo_errors = echo_errors
+        self._reported_lost = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._flush_loop, name="telemetry-writer", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def emit(self, event_type, values):
+        self.ring.push((event_type, time.time(), values))
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=2.0)
+        self.flush()
+        self.writer.close()
+
+    def flush(self):
+        while True:
+            records = self.ring.drain(self.batch_size)
+            if self.ring.lost != self._reported_lost:
+                records.append((EVENTS_LOST, time.time(), (self.ring.lost - self._reported_lost,)))
+                self._reported_lost = self.ring.lost
+            if not records:
+                return
+            self.writer.write_batch(records)
+            if self.echo_errors:
+                for event_type, _, values in records:
+                    if event_type is ERROR:
+                        print(f"[{values[0]}] {values[1]}")
+            if len(records) < self.batch_size:
+                return
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Telemetri yazılamadı: {e}")
+
+
+# Uygulama genelinde tek bus; start() çağrılmazsa emit() hiçbir şey yapmaz
+_bus = None
+
+
+def start(path=None, fmt=TELEMETRY_FORMAT):
+    global _bus
+    from telemetry.writers import create_writer
+
+    stop()
+    _bus = EventBus(create_writer(fmt, path))
+    _bus.start()
+    return _bus
+
+def stop():
+    global _bus
+    bus, _bus = _bus, None
+    if bus is not None:
+        bus.stop()
+
+def emit(event_type, *values):
+    bus = _bus
+    if bus is not None:
+        bus.emit(event_type, values)
+
+def error(source, message):
+    # Hata kaydı; telemetri kapalıysa eskisi gibi konsola yazılır
+    bus = _bus
+    if bus is not None:
+        bus.emit(ERROR, (source, str(message)))
+    else:
+        print(f"[{source}] {message}")
@@ -0,0 +1,166 @@
+import json
+import os
+import struct
+from config import *
+from telemetry.events import EVENT_TYPES
+
+
+class RotatingLogWriter:
+    # Toplu kayıtları dosyaya ekler; dosya max_bytes'ı aşınca path.1, path.2, ... olarak döndürülür
+    extension = ""
+
+    def __init__(self, path=None, max_bytes=TELEMETRY_MAX_BYTES, backup_count=TELEMETRY_BACKUP_COUNT):
+        self.path = path or os.path.join(TELEMETRY_DIR, "events" + self.extension)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._file = None
+        self._open()
+
+    def write_batch(self, records):
+        data = self.encode_batch(records)
+        if self._size and self._size + len(data) > self.max_bytes:
+            self._rotate()
+        self._file.write(data)
+        self._file.flush()
+        self._size += len(data)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def encode_batch(self, records):
+        raise NotImplementedError
+
+    def file_header(self):
+        return b""
+
+    def _open(self):
+        self._file = open(self.path, "ab")
+        self._size = self._file.tell()
+        if self._size == 0:
+            header = self.file_header()
+            self._file.write(header)
+            self._size = len(header)
+
+    def _rotate(self):
+        self._file.close()
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._open()
+
+
+class JsonlWriter(RotatingLogWriter):
+    extension = ".jsonl"
+
+    def encode_batch(self, records):
+        lines = []
+        for event_type, timestamp, values in records:
+            record = {"type": event_type.name, "t": round(timestamp, 6)}
+            record.update(zip(event_type.field_names, values))
+            lines.append(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class BinaryLogWriter(RotatingLogWriter):
+    # Dosya başı: MAGIC + şema uzunluğu (uint32) + JSON şema.
+    # Kayıt: tür kodu (uint8), zaman (float64), veri uzunluğu (uint16), alanlar.
+    extension = ".bin"
+    MAGIC = b"GEVLOG1\n"
+    RECORD = struct.Struct("<BdH")
+    SCHEMA_LENGTH = struct.Struct("<I")
+    FIELD_FORMATS = {"i": struct.Struct("<q"), "f": struct.Struct("<d"), "b": struct.Struct("<?")}
+    STRING_LENGTH = struct.Struct("<H")
+
+    def file_header(self):
+        schema = {code: [event_type.name, [list(field) for field in event_type.fields]]
+                  for code, event_type in EVENT_TYPES.items()}
+        schema_bytes = json.dumps(schema).encode("utf-8")
+        return self.MAGIC + self.SCHEMA_LENGTH.pack(len(schema_bytes)) + schema_bytes
+
+    def encode_batch(self, records):
+        chunks = []
+        for event_type, timestamp, values in records:
+            payload = b"".join(self._encode_field(kind, value)
+                               for (_, kind), value in zip(event_type.fields, values))
+            chunks.append(self.RECORD.pack(event_type.code, timestamp, len(payload)))
+            chunks.append(payload)
+        return b"".join(chunks)
+
+    def _encode_field(self, kind, value):
+        if kind == "s":
+            data = ("" if value is None else str(value)).encode("utf-8")[:0xFFFF]
+            return self.STRING_LENGTH.pack(len(data)) + data
+        if kind == "f":
+            return self.FIELD_FORMATS[kind].pack(float(value or 0.0))
+        if kind == "b":
+            return self.FIELD_FORMATS[kind].pack(bool(value))
+        return self.FIELD_FORMATS[kind].pack(int(value or 0))
+
+
+def create_writer(fmt=TELEMETRY_FORMAT, path=None):
+    if fmt == "jsonl":
+        return JsonlWriter(path)
+    if fmt == "binary":
+        return BinaryLogWriter(path)
+    raise ValueError(f"Bilinmeyen telemetri biçimi: {fmt}")
+
+
+def log_files(path):
+    # Döndürülmüş dosyalar dahil, en eskiden en yeniye
+    directory = os.path.dirname(path) or "."
+    prefix = os.path.basename(path) + "."
+    backups = []
+    for name in os.listdir(directory):
+        suffix = name[len(prefix):]
+        if name.startswith(prefix) and suffix.isdigit():
+            backups.append((int(suffix), os.path.join(directory, name)))
+    files = [file_path for _, file_path in sorted(backups, reverse=True)]
+    if os.path.exists(path):
+        files.append(path)
+    return files
+
+def read_events(path):
+    # JSONL veya binary günlüğü okur; her kayıt {"type", "t", alanlar...} sözlüğü olarak döner
+    for file_path in log_files(path):
+        with open(file_path, "rb") as f:
+            if f.read(len(BinaryLogWriter.MAGIC)) == BinaryLogWriter.MAGIC:
+                yield from _read_binary(f)
+            else:
+                f.seek(0)
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        yield json.loads(line)
+
+def _read_binary(f):
+    (schema_length,) = BinaryLogWriter.SCHEMA_LENGTH.unpack(f.read(BinaryLogWriter.SCHEMA_LENGTH.size))
+    schema = {int(code): entry for code, entry in json.loads(f.read(schema_length)).items()}
+    data = f.read()
+    offset = 0
+    record_size = BinaryLogWriter.RECORD.size
+    while offset + record_size <= len(data):
+        code, timestamp, payload_length = BinaryLogWriter.RECORD.unpack_from(data, offset)
+        offset += record_size
+        name, fields = schema[code]
+        record = {"type": name, "t": timestamp}
+        position = offset
+        for field, kind in fields:
+            if kind == "s":
+                (length,) = BinaryLogWriter.STRING_LENGTH.unpack_from(data, position)
+                position += BinaryLogWriter.STRING_LENGTH.size
+                record[field] = data[position:position + length].decode("utf-8")
+                position += length
+            else:
+                field_format = BinaryLogWriter.FIELD_FORMATS[kind]
+                (record[field],) = field_format.unpack_from(data, position)
+                position += field_format.size
+        offset += payload_length
+        yield record
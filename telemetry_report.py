@@ -0,0 +1,118 @@
+import argparse
+import os
+from collections import Counter, defaultdict
+import numpy as np
+from config import *
+from telemetry.writers import BinaryLogWriter, JsonlWriter, read_events
+
+
+def default_log_path():
+    writer = BinaryLogWriter if TELEMETRY_FORMAT == "binary" else JsonlWriter
+    return os.path.join(TELEMETRY_DIR, "events" + writer.extension)
+
+def percentiles(values, qs):
+    if not values:
+        return [0.0] * len(qs)
+    return [float(value) for value in np.percentile(values, qs)]
+
+def click_to_playback(records, timeout):
+    # Her play/resume/pause tıklamasını aynı şarkı için gelen ilk playback kaydıyla eşleştir
+    latencies = defaultdict(list)
+    failed = Counter()
+    unmatched = Counter()
+    pending = defaultdict(list)  # (şarkı, eylem) -> bekleyen tıklama zamanları
+
+    for record in records:
+        if record["type"] == "click" and record["action"] in ("play", "resume", "pause"):
+            pending[(record["song"], record["action"])].append(record["t"])
+        elif record["type"] == "playback":
+            clicks = pending.get((record["song"], record["action"]))
+            if not clicks:
+                continue
+            click_time = clicks.pop(0)
+            latency = record["t"] - click_time
+            if latency > timeout:
+                unmatched[record["action"]] += 1
+            elif record["ok"]:
+                latencies[record["action"]].append(latency * 1000)
+            else:
+                failed[record["action"]] += 1
+
+    for (_, action), clicks in pending.items():
+        unmatched[action] += len(clicks)
+    return latencies, failed, unmatched
+
+def summarize(path, qs, timeout):
+    records = sorted(read_events(path), key=lambda record: record["t"])
+    if not records:
+        print(f"Kayıt bulunamadı: {path}")
+        return
+
+    duration = records[-1]["t"] - records[0]["t"]
+    print(f"{len(records)} kayıt, {duration:.1f} sn ({path})")
+
+    header = "".join(f"{'p' + format(q, 'g'):>9}" for q in qs)
+    latencies, failed, unmatched = click_to_playback(records, timeout)
+    print("\nTıklamadan çalmaya gecikme (ms):")
+    print(f"  {'eylem':<10}{'adet':>6}{header}{'hata':>7}{'eşleşmeyen':>12}")
+    for action in ("play", "resume", "pause"):
+        values = latencies.get(action, [])
+        if not values and not failed[action] and not unmatched[action]:
+            continue
+        row = "".join(f"{value:>9.1f}" for value in percentiles(values, qs))
+        print(f"  {action:<10}{len(values):>6}{row}{failed[action]:>7}{unmatched[action]:>12}")
+
+    commands = defaultdict(list)
+    command_errors = Counter()
+    command_rejected = Counter()
+    for record in records:
+        if record["type"] == "command_rejected":
+            # Gönderilmeden reddedildi; gecikme yüzdeliklerine katılmaz
+            command_rejected[record["endpoint"]] += 1
+            commands.setdefault(record["endpoint"], [])
+        elif record["type"] == "command_finish":
+            commands[record["endpoint"]].append(record["latency_ms"])
+            if not record["ok"]:
+                command_errors[record["endpoint"]] += 1
+    if commands:
+        print("\nKomut gecikmesi (ms):")
+        print(f"  {'endpoint':<18}{'adet':>6}{header}{'hata':>7}{'reddedilen':>12}")
+        for endpoint, values in sorted(commands.items()):
+            row = "".join(f"{value:>9.1f}" for value in percentiles(values, qs))
+            print(f"  {endpoint:<18}{len(values):>6}{row}{command_errors[endpoint]:>7}"
+                  f"{command_rejected[endpoint]:>12}")
+
+    counts = Counter()
+    for record in records:
+        if record["type"] == "gesture":
+            counts[f"hareket {record['gesture']} {'başladı' if record['active'] else 'bitti'}"] += 1
+        elif record["type"] == "frame_drop":
+            counts[f"kare kaybı ({record['source']})"] += 1
+        elif record["type"] == "error":
+            counts[f"hata ({record['source']})"] += 1
+        elif record["type"] == "events_lost":
+            counts["kaybolan kayıt"] += record["count"]
+    if counts:
+        print("\nSayaçlar:")
+        for name, count in sorted(counts.items()):
+            print(f"  {name:<32}{count:>7}")
+
+    quality = [record for record in records if record["type"] == "quality"]
+    if quality:
+        print("\nKalite değişimleri:")
+        for record in quality:
+            print(f"  +{record['t'] - records[0]['t']:8.1f} sn  {record['component']:<10}"
+                  f"{record['level']:<14}{record['detail']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Telemetri günlüğünden gecikme özeti")
+    parser.add_argument("--log", default=default_log_path(),
+                        help="Günlük dosyası (döndürülmüş .1, .2 ... dosyaları da okunur)")
+    parser.add_argument("--percentiles", nargs="+", type=float, default=[50, 90, 95, 99])
+    parser.add_argument("--timeout", type=float, default=10.0,
+                        help="Bu süreden (sn) sonra gelen playback kaydı tıklamayla eşleştirilmez")
+    args = parser.parse_args()
+    summarize(args.log, args.percentiles, args.timeout)
+
+if __name__ == "__main__":
+    main()
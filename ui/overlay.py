@@ -0,0 +1,76 @@
+import cv2
+import numpy as np
+from config import *
+
+# MediaPipe HAND_CONNECTIONS ile aynı bağlantılar
+HAND_CONNECTIONS = np.array([
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (5, 9), (9, 10), (10, 11), (11, 12),
+    (9, 13), (13, 14), (14, 15), (15, 16),
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),
+], dtype=np.int32)
+
+
+class Stamp:
+    # Önceden çizilmiş bir şekil; her karede sadece piksel kopyalanır
+    def __init__(self, radius, draw):
+        size = radius * 2 + 1
+        patch = np.zeros((size, size, 3), np.uint8)
+        mask = np.zeros((size, size), np.uint8)
+        draw(patch, mask, (radius, radius))
+        dy, dx = np.nonzero(mask)
+        self.dy = (dy - radius).astype(np.int32)
+        self.dx = (dx - radius).astype(np.int32)
+        self.colors = patch[dy, dx]
+
+    def draw(self, frame, centers):
+        # centers: (N, 2) piksel koordinatları; tüm noktalar tek numpy işlemiyle basılır
+        if not len(centers):
+            return
+        ys = (centers[:, 1:2] + self.dy[None, :]).ravel()
+        xs = (centers[:, 0:1] + self.dx[None, :]).ravel()
+        colors = np.broadcast_to(self.colors, (len(centers),) + self.colors.shape).reshape(-1, 3)
+        inside = (ys >= 0) & (ys < frame.shape[0]) & (xs >= 0) & (xs < frame.shape[1])
+        frame[ys[inside], xs[inside]] = colors[inside]
+
+
+def _joint_stamp(patch, mask, center):
+    # mp.solutions.drawing_utils ile aynı görünüm: beyaz kenarlı kırmızı halka
+    for image, white, red in ((patch, (255, 255, 255), (0, 0, 255)), (mask, 255, 255)):
+        cv2.circle(image, center, 5, white, 2)
+        cv2.circle(image, center, 4, red, 2)
+
+
+def _cursor_stamp(color):
+    def draw(patch, mask, center):
+        for image, outline, fill in ((patch, CURSOR_OUTLINE_COLOR, color), (mask, 255, 255)):
+            cv2.circle(image, center, 22, outline, 2)  # Outer ring
+            cv2.circle(image, center, 18, fill, -1)  # Main circle
+            cv2.circle(image, center, 12, fill, -1)  # Inner circle
+    return draw
+
+
+class HandOverlayRenderer:
+    def __init__(self):
+        self.joint_stamp = Stamp(6, _joint_stamp)
+        self.cursor_stamp = Stamp(23, _cursor_stamp(ACCENT_COLOR))
+        self.click_cursor_stamp = Stamp(23, _cursor_stamp((0, 255, 0)))
+
+    def draw_hands(self, frame, hand_points):
+        # hand_points: her el için (21, 2+) normalized landmark dizisi
+        if not len(hand_points):
+            return
+        height, width = frame.shape[:2]
+        points = np.stack([np.asarray(points)[:, :2] for points in hand_points])
+        pixels = np.minimum((points * (width, height)).astype(np.int32), (width - 1, height - 1))
+
+        # Tüm ellerin tüm bağlantıları tek polylines çağrısıyla
+        segments = pixels[:, HAND_CONNECTIONS].reshape(-1, 2, 1, 2)
+        cv2.polylines(frame, list(segments), False, (255, 255, 255), 2)
+
+        self.joint_stamp.draw(frame, pixels.reshape(-1, 2))
+
+    def draw_cursor(self, frame, cursor_x, cursor_y, is_clicking=False):
+        stamp = self.click_cursor_stamp if is_clicking else self.cursor_stamp
+        stamp.draw(frame, np.array([[cursor_x, cursor_y]], np.int32))
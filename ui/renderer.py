@@ -2,12 +2,14 @@ import cv2
 import numpy as np
 from datetime import datetime
 from config import *
+from ui.overlay import HandOverlayRenderer
 
 class UIRenderer:
     def __init__(self, frame_width, frame_height):
         self.frame_width = frame_width
         self.frame_height = frame_height
         self.menu_items = []
+        self.overlay = HandOverlayRenderer()
 
     def create_gradient_background(self):
         gradient = np.zeros((self.frame_height, self.frame_width, 3), np.uint8)
@@ -16,9 +18,26 @@ class UIRenderer:
             gradient[i] = [value, value, value]
         return gradient
 
-    def draw_modern_ui(self, frame, cursor_x, cursor_y, scroll_pos, current_song, playlist_songs, is_clicking=False):
+    def canvas_size(self, region="both"):
+        if region == "both":
+            return self.frame_width * 2, self.frame_height
+        return self.frame_width, self.frame_height
+
+    def draw_modern_ui(self, frame, cursor_x, cursor_y, scroll_pos, current_song, playlist_songs, is_clicking=False,
+                       region="both", out=None):
+        # region: "both", "ui" veya "camera" - görünmeyen yarı hiç oluşturulmaz
+        # out: verilirse canvas bu buffer'a (ör. shared memory) doğrudan çizilir
+        if region == "camera":
+            canvas = out if out is not None else np.empty((self.frame_height, self.frame_width, 3), np.uint8)
+            cv2.resize(frame, (self.frame_width, self.frame_height), dst=canvas)
+            return canvas
+
+        ui_offset = self.frame_width if region == "both" else 0
+        canvas_width = ui_offset + self.frame_width
+
         # Create a larger canvas to hold both camera feed and UI
-        canvas = np.zeros((self.frame_height, self.frame_width * 2, 3), np.uint8)
+        # Her piksel aşağıda yazıldığı için out buffer'ını temizlemeye gerek yok
+        canvas = out if out is not None else np.zeros((self.frame_height, canvas_width, 3), np.uint8)
         
         # Create a darker gradient background for the UI part
         gradient_bg = np.zeros((self.frame_height, self.frame_width, 3), np.uint8)
@@ -26,14 +45,12 @@ class UIRenderer:
             value = int(12 + (i/self.frame_height)*8)  # Darker gradient
             gradient_bg[i] = [value, value, value]
 
-        # Resize camera frame to match canvas dimensions
-        resized_frame = cv2.resize(frame, (self.frame_width, self.frame_height))
-
-        # Place camera feed on the left side
-        canvas[:, :self.frame_width] = resized_frame
+        if region == "both":
+            # Place camera feed on the left side
+            cv2.resize(frame, (self.frame_width, self.frame_height), dst=canvas[:, :self.frame_width])
 
         # Place UI on the right side with a modern dark theme
-        canvas[:, self.frame_width:] = gradient_bg
+        canvas[:, ui_offset:] = gradient_bg
 
         # Create and resize sidebar with a slightly lighter gradient
         sidebar_gradient = np.zeros((self.frame_height, SIDEBAR_WIDTH, 3), np.uint8)
@@ -42,20 +59,20 @@ class UIRenderer:
             sidebar_gradient[i] = [value, value, value]
         
         # Apply sidebar gradient with a subtle border
-        canvas[:, self.frame_width:self.frame_width + SIDEBAR_WIDTH] = sidebar_gradient
+        canvas[:, ui_offset:ui_offset + SIDEBAR_WIDTH] = sidebar_gradient
         cv2.line(canvas, 
-                (self.frame_width + SIDEBAR_WIDTH, 0), 
-                (self.frame_width + SIDEBAR_WIDTH, self.frame_height), 
+                (ui_offset + SIDEBAR_WIDTH, 0), 
+                (ui_offset + SIDEBAR_WIDTH, self.frame_height), 
                 (30, 30, 30), 2)
 
         # Draw a subtle top bar
         cv2.rectangle(canvas, 
-                     (self.frame_width, 0), 
-                     (self.frame_width * 2, TOP_BAR_HEIGHT), 
+                     (ui_offset, 0), 
+                     (ui_offset + self.frame_width, TOP_BAR_HEIGHT), 
                      (20, 20, 20), -1)
         cv2.line(canvas, 
-                (self.frame_width, TOP_BAR_HEIGHT), 
-                (self.frame_width * 2, TOP_BAR_HEIGHT), 
+                (ui_offset, TOP_BAR_HEIGHT), 
+                (ui_offset + self.frame_width, TOP_BAR_HEIGHT), 
                 (30, 30, 30), 2)
 
         # Adjust cursor coordinates for the UI part if cursor is on the right side
@@ -64,7 +81,7 @@ class UIRenderer:
             ui_cursor_x = cursor_x - self.frame_width
 
         # Draw UI elements on the right side
-        self._draw_current_time(canvas, self.frame_width)
+        self._draw_current_time(canvas, ui_offset)
         
         # Draw Now Playing text at the top with enhanced styling
         if current_song:
@@ -78,26 +95,25 @@ class UIRenderer:
             
             # Enhanced text shadow
             cv2.putText(canvas, status_text,
-                       (self.frame_width + SIDEBAR_WIDTH + CONTENT_PADDING + 2, text_y + 2),
+                       (ui_offset + SIDEBAR_WIDTH + CONTENT_PADDING + 2, text_y + 2),
                        font, 1.0, (0, 0, 0), 4, cv2.LINE_AA)
             
             # Brighter main text
             cv2.putText(canvas, status_text,
-                       (self.frame_width + SIDEBAR_WIDTH + CONTENT_PADDING, text_y),
+                       (ui_offset + SIDEBAR_WIDTH + CONTENT_PADDING, text_y),
                        font, 1.0, (*ACCENT_COLOR, 255) if current_song.is_playing else (*TEXT_COLOR_SECONDARY, 255), 2, cv2.LINE_AA)
 
         # Draw menu items, current song, and playlist with adjusted x coordinates
-        self._draw_menu_items(canvas, ui_cursor_x, cursor_y, self.frame_width)
-        self._draw_current_song(canvas, current_song, ui_cursor_x, cursor_y, self.frame_width)
-        self._draw_playlist(canvas, ui_cursor_x, cursor_y, scroll_pos, playlist_songs, self.frame_width, current_song)
+        self._draw_menu_items(canvas, ui_cursor_x, cursor_y, ui_offset)
+        self._draw_current_song(canvas, current_song, ui_cursor_x, cursor_y, ui_offset)
+        self._draw_playlist(canvas, ui_cursor_x, cursor_y, scroll_pos, playlist_songs, ui_offset, current_song)
         
         # Draw cursor on both sides with enhanced visual
         if cursor_x != -1 and cursor_y != -1:
             # Draw cursor on camera feed side
-            cv2.circle(canvas, (cursor_x, cursor_y), 22, (*CURSOR_OUTLINE_COLOR, 150), 2)  # Outer ring
-            cursor_color = (0, 255, 0) if is_clicking else ACCENT_COLOR
-            cv2.circle(canvas, (cursor_x, cursor_y), 18, (*cursor_color, 200), -1)  # Main circle
-            cv2.circle(canvas, (cursor_x, cursor_y), 12, (*cursor_color, 255), -1)  # Inner circle
+            cursor_x = cursor_x - self.frame_width + ui_offset
+            # Halka ve daireler önceden hazırlanmış tek bir stamp olarak basılır
+            self.overlay.draw_cursor(canvas, cursor_x, cursor_y, is_clicking)
 
         return canvas
 
@@ -0,0 +1,209 @@
+import os
+import struct
+import threading
+import cv2
+import numpy as np
+from config import *
+from telemetry import events
+
+
+class OutputSink:
+    def open(self, width, height):
+        self.width = width
+        self.height = height
+
+    def acquire(self):
+        # Renderer'ın doğrudan içine çizebileceği buffer; yoksa renderer kendi canvas'ını oluşturur
+        return None
+
+    def write(self, canvas):
+        raise NotImplementedError
+
+    def poll_key(self):
+        return -1
+
+    def toggle_fullscreen(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class WindowSink(OutputSink):
+    def __init__(self, window_name="Modern Music Player", window_size=None):
+        self.window_name = window_name
+        self.window_size = window_size
+        self.fullscreen = False
+        self._key = -1
+
+    def open(self, width, height):
+        super().open(width, height)
+        # Create window with double width for split view
+        cv2.namedWindow(self.window_name, cv2.WINDOW_NORMAL)
+        cv2.resizeWindow(self.window_name, *(self.window_size or (width, height)))
+
+    def write(self, canvas):
+        cv2.imshow(self.window_name, canvas)
+        self._key = cv2.waitKey(1)
+
+    def poll_key(self):
+        return self._key
+
+    def toggle_fullscreen(self):
+        self.fullscreen = not self.fullscreen
+        if self.fullscreen:
+            cv2.setWindowProperty(self.window_name, cv2.WND_PROP_FULLSCREEN,
+                                  cv2.WINDOW_FULLSCREEN)
+        else:
+            cv2.setWindowProperty(self.window_name, cv2.WND_PROP_FULLSCREEN,
+                                  cv2.WINDOW_NORMAL)
+
+    def close(self):
+        cv2.destroyWindow(self.window_name)
+
+
+class VideoFileSink(OutputSink):
+    def __init__(self, path=OUTPUT_VIDEO_PATH, fps=OUTPUT_FPS, fourcc=OUTPUT_VIDEO_FOURCC):
+        self.path = path
+        self.fps = fps
+        self.fourcc = fourcc
+        self.writer = None
+
+    def open(self, width, height):
+        super().open(width, height)
+        self.writer = cv2.VideoWriter(self.path, cv2.VideoWriter_fourcc(*self.fourcc), self.fps, (width, height))
+        if not self.writer.isOpened():
+            raise RuntimeError(f"Video dosyası açılamadı: {self.path}")
+
+    def write(self, canvas):
+        self.writer.write(canvas)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.release()
+            self.writer = None
+
+
+class PipeSink(OutputSink):
+    # Ham BGR kareleri (height x width x 3, uint8) named pipe'a yazar.
+    # Yazma arka plan thread'inde yapılır; okuyucu yavaşsa eski kareler atlanır.
+    def __init__(self, path=OUTPUT_PIPE_PATH):
+        self.path = path
+        self.dropped_frames = 0
+        self._pending = None
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = None
+
+    def open(self, width, height):
+        super().open(width, height)
+        if not os.path.exists(self.path):
+            os.mkfifo(self.path)
+        print(f"Kareler {self.path} adresine yazılıyor ({width}x{height} bgr24)")
+        self._thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._thread.start()
+
+    def write(self, canvas):
+        with self._cond:
+            if self._pending is not None:
+                self.dropped_frames += 1
+                events.emit(events.FRAME_DROP, 0, "pipe", 0.0)
+            self._pending = canvas
+            self._cond.notify()
+
+    def _write_loop(self):
+        # open() okuyucu bağlanana kadar bekler, bu yüzden ana döngüde yapılmaz
+        fd = os.open(self.path, os.O_WRONLY)
+        try:
+            while True:
+                with self._cond:
+                    while self._pending is None and not self._closed:
+                        self._cond.wait()
+                    if self._closed:
+                        return
+                    canvas, self._pending = self._pending, None
+                # Kopyasız yazma: numpy buffer'ı doğrudan os.write'a verilir
+                view = memoryview(np.ascontiguousarray(canvas)).cast("B")
+                while view:
+                    written = os.write(fd, view)
+                    view = view[written:]
+        except BrokenPipeError:
+            print("Pipe okuyucusu bağlantıyı kapattı")
+        finally:
+            os.close(fd)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+
+
+class SharedMemorySink(OutputSink):
+    # Bellek düzeni: başlık + iki kare yuvası (double buffer).
+    # Başlık: sequence (uint64), width, height, channels, aktif yuva (uint32).
+    # Okuyucu aktif yuvayı okur ve okuma sonrası sequence değişmediyse kare tutarlıdır.
+    HEADER = struct.Struct("<QIIII")
+
+    def __init__(self, name=OUTPUT_SHM_NAME):
+        self.name = name
+        self.shm = None
+        self.sequence = 0
+        self._slots = []
+        self._write_slot = 0
+
+    def open(self, width, height):
+        from multiprocessing import shared_memory
+
+        super().open(width, height)
+        frame_bytes = width * height * 3
+        size = self.HEADER.size + frame_bytes * 2
+        try:
+            self.shm = shared_memory.SharedMemory(name=self.name, create=True, size=size)
+        except FileExistsError:
+            # Önceki çalışmadan kalan segmenti yeniden oluştur
+            stale = shared_memory.SharedMemory(name=self.name)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=self.name, create=True, size=size)
+
+        self._slots = [
+            np.ndarray((height, width, 3), np.uint8, buffer=self.shm.buf,
+                       offset=self.HEADER.size + frame_bytes * slot)
+            for slot in range(2)
+        ]
+        self._publish(active_slot=1)
+        print(f"Kareler '{self.name}' shared memory segmentine yazılıyor ({width}x{height} bgr24)")
+
+    def acquire(self):
+        return self._slots[self._write_slot]
+
+    def write(self, canvas):
+        slot = self._slots[self._write_slot]
+        if canvas is not slot:
+            slot[:] = canvas
+        self._publish(active_slot=self._write_slot)
+        self._write_slot = 1 - self._write_slot
+
+    def _publish(self, active_slot):
+        self.sequence += 1
+        self.HEADER.pack_into(self.shm.buf, 0, self.sequence, self.width, self.height, 3, active_slot)
+
+    def close(self):
+        if self.shm is not None:
+            self._slots = []
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+
+def create_sink(kind=OUTPUT_SINK, window_size=None, target=None):
+    # target: pencere adı, video yolu, pipe yolu veya shm adı; verilmezse config'teki değer kullanılır
+    if kind == "window":
+        return WindowSink(target or "Modern Music Player", window_size=window_size)
+    if kind == "video":
+        return VideoFileSink(target or OUTPUT_VIDEO_PATH)
+    if kind == "pipe":
+        return PipeSink(target or OUTPUT_PIPE_PATH)
+    if kind == "shm":
+        return SharedMemorySink(target or OUTPUT_SHM_NAME)
+    raise ValueError(f"Bilinmeyen çıktı türü: {kind}")